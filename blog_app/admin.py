@@ -1,8 +1,140 @@
-from django.contrib import admin
-from .models import Category, Post, Comment, Like
-
-# Register your models here.
-admin.site.register(Category)
-admin.site.register(Post)
-admin.site.register(Comment)
-admin.site.register(Like)
\ No newline at end of file
+from django.contrib import admin, messages
+from django.db import transaction
+from django.utils import timezone
+
+from django_blog_project.pagination import EstimatedCountPaginator
+from .models import Category, Post, Comment, Like, TimelineEntry, AuthorStats, RelatedPost, QueuedEmail
+from . import category_index, timeline
+from . import stats
+from .stats import recompute_author_stats
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    """
+    Defaults for changelists of tables with millions of rows: no full COUNT(*)
+    per page, and related objects joined in the page query instead of loaded
+    one row at a time by __str__.
+    """
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False  # avoids a second COUNT(*) of the whole table when filtering
+
+
+def _recount_authors(author_ids):
+    for author_id in set(author_ids):
+        recompute_author_stats(author_id)
+
+
+@admin.register(Category)
+class CategoryAdmin(admin.ModelAdmin):
+    list_display = ('name', 'description')
+    search_fields = ('=name',)  # exact match uses the unique name index
+
+
+@admin.register(Post)
+class PostAdmin(LargeTableAdmin):
+    list_display = ('title', 'author', 'is_published', 'publish_at', 'created_at')
+    list_select_related = ('author',)
+    list_filter = ('is_published', 'created_at', 'categories')  # is_published and created_at are indexed
+    search_fields = ('title',)  # substring search scans the posts table; narrow with the filters first
+    autocomplete_fields = ('author',)
+    filter_horizontal = ('categories',)
+    actions = ('publish_now', 'unpublish')
+
+    @admin.action(description='Publish selected posts now')
+    def publish_now(self, request, queryset):
+        self._set_published(request, queryset, True)
+
+    @admin.action(description='Unpublish selected posts (back to draft)')
+    def unpublish(self, request, queryset):
+        self._set_published(request, queryset, False)
+
+    def _set_published(self, request, queryset, is_published):
+        with transaction.atomic():
+            posts = list(queryset.values_list('pk', 'author_id'))
+            post_ids = [pk for pk, _ in posts]
+            if is_published:
+                # Newly published posts are listed from now, like scheduled posts from their publish time
+                queryset.filter(is_published=False).update(created_at=timezone.now())
+            # publish_at is cleared so the scheduler does not flip these posts again
+            updated = queryset.update(is_published=is_published, publish_at=None)
+            category_index.sync_posts(post_ids)
+            timeline.retime_posts(post_ids)
+            _recount_authors(author_id for _, author_id in posts)
+        self.message_user(request, f'{updated} post(s) updated.', messages.SUCCESS)
+
+
+@admin.register(Comment)
+class CommentAdmin(LargeTableAdmin):
+    list_display = ('id', 'post', 'author', 'created_at')
+    list_select_related = ('post', 'author')
+    list_filter = ('created_at',)  # indexed
+    search_fields = ('=author__username',)  # exact match uses the unique username index
+    raw_id_fields = ('post', 'author')
+
+
+@admin.register(Like)
+class LikeAdmin(LargeTableAdmin):
+    list_display = ('id', 'post', 'user')
+    list_select_related = ('post', 'user')
+    search_fields = ('=user__username',)
+    raw_id_fields = ('post', 'user')
+    actions = ('delete_selected_fast',)
+
+    @admin.action(description='Delete selected likes (without per-row stats updates)', permissions=['delete'])
+    def delete_selected_fast(self, request, queryset):
+        # The stock delete_selected renders a confirmation page listing every like and
+        # updates AuthorStats once per deleted row; this deletes batches of ids, each in
+        # its own short transaction with the per-row updates muted, so the write lock
+        # is released between batches. The affected authors are recounted once each.
+        author_ids = list(queryset.values_list('post__author_id', flat=True).distinct())
+        deleted, last_pk = 0, 0
+        while True:
+            pks = list(queryset.filter(pk__gt=last_pk).order_by('pk').values_list('pk', flat=True)[:1000])
+            if not pks:
+                break
+            with transaction.atomic(), stats.deferred():
+                deleted += Like.objects.filter(pk__in=pks).delete()[0]
+            last_pk = pks[-1]
+        _recount_authors(author_ids)
+        self.message_user(request, f'{deleted} like(s) deleted.', messages.SUCCESS)
+
+
+@admin.register(TimelineEntry)
+class TimelineEntryAdmin(LargeTableAdmin):
+    list_display = ('id', 'user', 'post', 'created_at')
+    list_select_related = ('user', 'post')
+    raw_id_fields = ('user', 'post')
+
+
+@admin.register(RelatedPost)
+class RelatedPostAdmin(LargeTableAdmin):
+    list_display = ('post', 'rank', 'related', 'score')
+    list_select_related = ('post', 'related')
+    raw_id_fields = ('post', 'related')
+
+
+@admin.register(AuthorStats)
+class AuthorStatsAdmin(LargeTableAdmin):
+    list_display = ('user', 'post_count', 'likes_received', 'comments_received', 'updated_at')
+    list_select_related = ('user',)
+    raw_id_fields = ('user',)
+    actions = ('recompute',)
+
+    @admin.action(description='Recompute selected stats')
+    def recompute(self, request, queryset):
+        _recount_authors(queryset.values_list('user_id', flat=True))
+        self.message_user(request, 'Stats recomputed.', messages.SUCCESS)
+
+
+@admin.register(QueuedEmail)
+class QueuedEmailAdmin(LargeTableAdmin):
+    list_display = ('subject', 'recipients', 'status', 'attempts', 'next_attempt_at', 'last_error')
+    list_filter = ('status',)
+    exclude = ('message',)  # may contain password reset links
+    readonly_fields = ('from_email', 'recipients', 'subject', 'attempts', 'last_error', 'created_at')
+    actions = ('retry_now',)
+
+    @admin.action(description='Retry selected emails now')
+    def retry_now(self, request, queryset):
+        updated = queryset.update(status=QueuedEmail.PENDING, attempts=0, next_attempt_at=timezone.now())
+        self.message_user(request, f'{updated} email(s) queued again.', messages.SUCCESS)
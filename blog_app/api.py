@@ -0,0 +1,275 @@
+"""
+Read-only JSON API (v1) over posts, comments and categories.
+
+Query parameters understood by the list and detail endpoints:
+
+- fields=id,title,...  only return these fields; only the matching columns
+  are loaded from the database (QuerySet.only()).
+- expand=author,categories,comments  embed related objects instead of ids;
+  they are fetched with select_related()/prefetch_related(), never per row.
+- cursor=..., limit=N  cursor pagination on (created_at, id). The cursor of
+  the next page is returned in "next".
+
+Responses carry an ETag and honour If-None-Match with 304 Not Modified.
+"""
+import base64
+import hashlib
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import OuterRef, Prefetch, Q
+from django.http import Http404, HttpResponse, JsonResponse
+from django.shortcuts import get_object_or_404
+from django.utils.cache import get_conditional_response
+from django.utils.dateparse import parse_datetime
+from django.views.generic import View
+
+from .models import Post, Comment, Category, Like
+from .stats import subquery_count
+
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 100
+
+
+class ApiError(Exception):
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+class Field:
+    """
+    One field of a resource.
+
+    columns are the model columns the field needs (for only()); expand_columns
+    are needed instead when the field is expanded. value(obj, expanded)
+    returns the JSON value.
+    """
+    def __init__(self, value, columns=(), expand_columns=None, prepare=None):
+        self.value = value
+        self.columns = columns
+        self.expand_columns = expand_columns if expand_columns is not None else columns
+        # prepare(queryset, expanded) adds select_related/prefetch_related/annotate
+        self.prepare = prepare
+
+
+def _author(obj, expanded):
+    if expanded:
+        return {'id': obj.author_id, 'username': obj.author.username}
+    return obj.author_id
+
+
+def _prefetch_categories(queryset, expanded):
+    return queryset.prefetch_related(Prefetch('categories', queryset=Category.objects.only('id', 'name')))
+
+
+def _categories(post, expanded):
+    if expanded:
+        return [{'id': category.pk, 'name': category.name} for category in post.categories.all()]
+    return [category.pk for category in post.categories.all()]
+
+
+def _prefetch_comments(queryset, expanded):
+    comments = Comment.objects.only('id', 'post_id', 'content', 'created_at', 'author_id', 'author__username').select_related('author')
+    return queryset.prefetch_related(Prefetch('comments', queryset=comments))
+
+
+def _comments(post, expanded):
+    return [serialize(comment, COMMENT_FIELDS, COMMENT_FIELDS.keys(), {'author'}) for comment in post.comments.all()]
+
+
+def _annotate_like_count(queryset, expanded):
+    return queryset.annotate(like_count=subquery_count(Like.objects.filter(post=OuterRef('pk')), 'post'))
+
+
+def _annotate_comment_count(queryset, expanded):
+    return queryset.annotate(comment_count=subquery_count(Comment.objects.filter(post=OuterRef('pk')), 'post'))
+
+
+POST_FIELDS = {
+    'id': Field(lambda p, e: p.pk, ('id',)),
+    'title': Field(lambda p, e: p.title, ('title',)),
+    'content': Field(lambda p, e: p.content, ('content',)),
+    'created_at': Field(lambda p, e: p.created_at, ('created_at',)),
+    'updated_at': Field(lambda p, e: p.updated_at, ('updated_at',)),
+    'cover_image': Field(lambda p, e: p.cover_image.url if p.cover_image else None, ('cover_image',)),
+    'url': Field(lambda p, e: p.get_absolute_url(), ('id',)),
+    'author': Field(
+        _author, ('author_id',), ('author_id', 'author__username'),
+        prepare=lambda qs, expanded: qs.select_related('author') if expanded else qs,
+    ),
+    'categories': Field(_categories, prepare=_prefetch_categories),
+    'like_count': Field(lambda p, e: p.like_count, prepare=_annotate_like_count),
+    'comment_count': Field(lambda p, e: p.comment_count, prepare=_annotate_comment_count),
+    'comments': Field(_comments, prepare=_prefetch_comments),
+}
+POST_DEFAULT_FIELDS = ['id', 'title', 'created_at', 'author', 'categories', 'like_count', 'comment_count', 'url']
+POST_DETAIL_FIELDS = POST_DEFAULT_FIELDS + ['content', 'updated_at', 'cover_image']
+
+COMMENT_FIELDS = {
+    'id': Field(lambda c, e: c.pk, ('id',)),
+    'post': Field(lambda c, e: c.post_id, ('post_id',)),
+    'content': Field(lambda c, e: c.content, ('content',)),
+    'created_at': Field(lambda c, e: c.created_at, ('created_at',)),
+    'author': Field(
+        _author, ('author_id',), ('author_id', 'author__username'),
+        prepare=lambda qs, expanded: qs.select_related('author') if expanded else qs,
+    ),
+}
+
+CATEGORY_FIELDS = {
+    'id': Field(lambda c, e: c.pk, ('id',)),
+    'name': Field(lambda c, e: c.name, ('name',)),
+    'description': Field(lambda c, e: c.description, ('description',)),
+}
+
+
+def serialize(obj, spec, fields, expand):
+    return {name: spec[name].value(obj, name in expand) for name in fields}
+
+
+def _split(value):
+    return [item for item in (value or '').split(',') if item]
+
+
+def encode_cursor(obj):
+    raw = f'{obj.created_at.isoformat()}|{obj.pk}'
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor):
+    try:
+        created_at, pk = base64.urlsafe_b64decode(cursor.encode()).decode().split('|')
+        created_at = parse_datetime(created_at)
+        if created_at is None:
+            raise ValueError
+        return created_at, int(pk)
+    except (ValueError, UnicodeDecodeError):
+        raise ApiError('Invalid cursor.')
+
+
+class ApiView(View):
+    """Base class of the API views: field selection, expansion, errors and ETags."""
+    http_method_names = ['get', 'head', 'options']
+    spec = None
+    default_fields = None
+    required_columns = ('id',)
+
+    def get_fields(self):
+        fields = _split(self.request.GET.get('fields')) or self.default_fields
+        unknown = [name for name in fields if name not in self.spec]
+        if unknown:
+            raise ApiError(f"Unknown field(s): {', '.join(unknown)}.")
+        return fields
+
+    def get_expand(self):
+        return set(_split(self.request.GET.get('expand')))
+
+    def prepare(self, queryset, fields, expand):
+        """Restrict the columns loaded to what the requested fields need, and batch related lookups."""
+        columns = set()
+        for name in fields:
+            field = self.spec[name]
+            columns.update(field.expand_columns if name in expand else field.columns)
+            if field.prepare is not None:
+                queryset = field.prepare(queryset, name in expand)
+        return queryset.only(*self.required_columns, *columns)
+
+    def get(self, request, *args, **kwargs):
+        try:
+            payload = self.get_payload(request, *args, **kwargs)
+        except ApiError as error:
+            return JsonResponse({'detail': str(error)}, status=error.status)
+        except Http404:
+            return JsonResponse({'detail': 'Not found.'}, status=404)
+
+        body = json.dumps(payload, cls=DjangoJSONEncoder)
+        etag = '"%s"' % hashlib.md5(body.encode()).hexdigest()
+        not_modified = get_conditional_response(request, etag=etag)
+        if not_modified is not None:
+            return not_modified
+        response = HttpResponse(body, content_type='application/json')
+        response['ETag'] = etag
+        return response
+
+
+class CursorListMixin:
+    """Keyset pagination on (created_at, id) in the direction given by `descending`."""
+    descending = True
+    required_columns = ('id', 'created_at')  # the cursor is built from them
+
+    def paginate(self, queryset):
+        try:
+            limit = min(int(self.request.GET.get('limit', DEFAULT_LIMIT)), MAX_LIMIT)
+        except ValueError:
+            raise ApiError('limit must be an integer.')
+        if limit < 1:
+            raise ApiError('limit must be positive.')
+
+        cursor = self.request.GET.get('cursor')
+        if cursor:
+            created_at, pk = decode_cursor(cursor)
+            if self.descending:
+                queryset = queryset.filter(Q(created_at__lt=created_at) | Q(created_at=created_at, pk__lt=pk))
+            else:
+                queryset = queryset.filter(Q(created_at__gt=created_at) | Q(created_at=created_at, pk__gt=pk))
+
+        ordering = ('-created_at', '-pk') if self.descending else ('created_at', 'pk')
+        page = list(queryset.order_by(*ordering)[:limit + 1])
+        next_cursor = encode_cursor(page[limit - 1]) if len(page) > limit else None
+        return page[:limit], next_cursor
+
+
+class PostListApiView(CursorListMixin, ApiView):
+    spec = POST_FIELDS
+    default_fields = POST_DEFAULT_FIELDS
+
+    def get_payload(self, request, *args, **kwargs):
+        fields, expand = self.get_fields(), self.get_expand()
+        queryset = Post.objects.published()
+        category = request.GET.get('category')
+        if category:
+            try:
+                queryset = queryset.filter(categories__id=int(category))
+            except ValueError:
+                raise ApiError('category must be an integer.')
+        posts, next_cursor = self.paginate(self.prepare(queryset, fields, expand))
+        return {
+            'results': [serialize(post, self.spec, fields, expand) for post in posts],
+            'next': next_cursor,
+        }
+
+
+class PostDetailApiView(ApiView):
+    spec = POST_FIELDS
+    default_fields = POST_DETAIL_FIELDS
+
+    def get_payload(self, request, *args, **kwargs):
+        fields, expand = self.get_fields(), self.get_expand()
+        queryset = self.prepare(Post.objects.published(), fields, expand)
+        return serialize(get_object_or_404(queryset, pk=kwargs['pk']), self.spec, fields, expand)
+
+
+class CommentListApiView(CursorListMixin, ApiView):
+    spec = COMMENT_FIELDS
+    default_fields = list(COMMENT_FIELDS)
+    descending = False
+
+    def get_payload(self, request, *args, **kwargs):
+        fields, expand = self.get_fields(), self.get_expand()
+        post = get_object_or_404(Post.objects.published().only('id'), pk=kwargs['pk'])
+        comments, next_cursor = self.paginate(self.prepare(Comment.objects.filter(post=post), fields, expand))
+        return {
+            'results': [serialize(comment, self.spec, fields, expand) for comment in comments],
+            'next': next_cursor,
+        }
+
+
+class CategoryListApiView(ApiView):
+    spec = CATEGORY_FIELDS
+    default_fields = ['id', 'name']
+
+    def get_payload(self, request, *args, **kwargs):
+        fields, expand = self.get_fields(), self.get_expand()
+        categories = self.prepare(Category.objects.order_by('name'), fields, expand)
+        return {'results': [serialize(category, self.spec, fields, expand) for category in categories]}
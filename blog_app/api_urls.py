@@ -0,0 +1,15 @@
+# urls of the read-only JSON API, mounted under /api/v1/
+from django.urls import path
+from .api import (
+    PostListApiView,
+    PostDetailApiView,
+    CommentListApiView,
+    CategoryListApiView,
+)
+
+urlpatterns = [
+    path('posts/', PostListApiView.as_view(), name='api-post-list'),
+    path('posts/<int:pk>/', PostDetailApiView.as_view(), name='api-post-detail'),
+    path('posts/<int:pk>/comments/', CommentListApiView.as_view(), name='api-comment-list'),
+    path('categories/', CategoryListApiView.as_view(), name='api-category-list'),
+]
@@ -0,0 +1,81 @@
+"""
+Per-category index of published posts (CategoryPost).
+
+Listing a category used to join Post_categories with Post, filter on
+is_published and sort by created_at. CategoryPost holds one row per
+(category, published post) with the post's created_at, so a category page and
+its count are ranges of the (category, created_at, post) index and only the
+posts of the page itself are loaded.
+
+The rows follow Post.categories through the m2m_changed receivers in
+blog_app/signals.py, and publishing changes through sync_posts(). Code that
+changes is_published with QuerySet.update() must call sync_posts() itself.
+"""
+from django.db import transaction
+
+from .models import CategoryPost, Post
+
+Membership = Post.categories.through
+
+
+def _rows(memberships):
+    return [
+        CategoryPost(post_id=post_id, category_id=category_id, created_at=created_at)
+        for post_id, category_id, created_at in memberships.values_list('post_id', 'category_id', 'post__created_at')
+    ]
+
+
+def add(post_ids, category_ids):
+    """Index new category memberships of published posts."""
+    memberships = Membership.objects.filter(post_id__in=post_ids, category_id__in=category_ids, post__is_published=True)
+    CategoryPost.objects.bulk_create(_rows(memberships), ignore_conflicts=True)
+
+
+def remove(post_ids=None, category_ids=None):
+    """Drop the index rows of the given posts and/or categories (None: any)."""
+    rows = CategoryPost.objects.all()
+    if post_ids is not None:
+        rows = rows.filter(post_id__in=post_ids)
+    if category_ids is not None:
+        rows = rows.filter(category_id__in=category_ids)
+    rows.delete()
+
+
+def sync_posts(post_ids):
+    """Re-index the given posts after they were published, unpublished or edited."""
+    with transaction.atomic():
+        CategoryPost.objects.filter(post_id__in=post_ids).delete()
+        CategoryPost.objects.bulk_create(_rows(Membership.objects.filter(post_id__in=post_ids, post__is_published=True)))
+
+
+def rebuild(batch_size=5000):
+    """Rebuild the whole index from Post.categories. Returns the number of rows."""
+    memberships = (
+        Membership.objects
+        .filter(post__is_published=True)
+        .values_list('post_id', 'category_id', 'post__created_at')
+        .iterator(chunk_size=batch_size)
+    )
+    count = 0
+    with transaction.atomic():
+        CategoryPost.objects.all().delete()
+        batch = []
+        for post_id, category_id, created_at in memberships:
+            batch.append(CategoryPost(post_id=post_id, category_id=category_id, created_at=created_at))
+            if len(batch) >= batch_size:
+                CategoryPost.objects.bulk_create(batch)
+                count += len(batch)
+                batch = []
+        CategoryPost.objects.bulk_create(batch)
+        count += len(batch)
+    return count
+
+
+def category_post_ids(category_id):
+    """ids of the category's published posts, newest first, read off the index alone."""
+    return (
+        CategoryPost.objects
+        .filter(category_id=category_id)
+        .order_by('-created_at', '-post_id')
+        .values_list('post_id', flat=True)
+    )
@@ -0,0 +1,169 @@
+"""
+Queued email.
+
+QueuedEmailBackend (settings.EMAIL_BACKEND) renders each message and stores
+it as a QueuedEmail row, so send_mail() and the password reset views return
+after one INSERT instead of waiting on the SMTP server's TLS handshake.
+
+The send_queued_mail worker delivers the queue in batches over a single
+connection of settings.QUEUED_EMAIL_DELIVERY_BACKEND (the SMTP backend, using
+the EMAIL_HOST settings). A message that fails is retried with exponential
+backoff, up to settings.QUEUED_EMAIL_MAX_ATTEMPTS attempts.
+
+Delivered messages are deleted, since password reset mails contain login links.
+"""
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import get_connection
+from django.core.mail.backends.base import BaseEmailBackend
+from django.db import transaction
+from django.utils import timezone
+
+from .models import QueuedEmail
+
+logger = logging.getLogger(__name__)
+
+# Claimed messages are skipped by other workers for this long
+CLAIM_TIMEOUT = timedelta(minutes=5)
+
+
+def _delivery_backend() -> str:
+    return getattr(settings, 'QUEUED_EMAIL_DELIVERY_BACKEND', 'django.core.mail.backends.smtp.EmailBackend')
+
+
+def _max_attempts() -> int:
+    return getattr(settings, 'QUEUED_EMAIL_MAX_ATTEMPTS', 5)
+
+
+def _retry_delay(attempts) -> timedelta:
+    # 1, 2, 4, 8... minutes
+    return timedelta(minutes=2 ** (attempts - 1))
+
+
+class QueuedEmailBackend(BaseEmailBackend):
+    """Store outgoing messages for the send_queued_mail worker instead of sending them."""
+
+    def send_messages(self, email_messages):
+        queued = [
+            QueuedEmail(
+                from_email=message.from_email,
+                recipients=message.recipients(),
+                subject=str(message.subject)[:255],
+                message=message.message().as_bytes(linesep='\r\n'),
+            )
+            for message in email_messages
+            if message.recipients()
+        ]
+        try:
+            QueuedEmail.objects.bulk_create(queued)
+        except Exception:
+            if not self.fail_silently:
+                raise
+            return 0
+        return len(queued)
+
+
+class StoredMessage:
+    """
+    A queued message in the shape the Django email backends send: the SMTP
+    backend calls recipients() and message().as_bytes(), the locmem backend
+    appends it to mail.outbox.
+    """
+    encoding = None
+
+    def __init__(self, queued):
+        self.queued = queued
+        self.from_email = queued.from_email
+        self.subject = queued.subject
+
+    def recipients(self):
+        return self.queued.recipients
+
+    def message(self):
+        return self
+
+    def as_bytes(self, unixfrom=False, linesep='\r\n'):
+        return bytes(self.queued.message)
+
+
+def claim_batch(batch_size, now=None):
+    """
+    Take up to batch_size due messages off the queue.
+
+    Their next attempt is pushed CLAIM_TIMEOUT into the future in the same
+    transaction, so workers running side by side never send a message twice.
+    """
+    now = now or timezone.now()
+    with transaction.atomic():
+        due = list(
+            QueuedEmail.objects
+            .filter(status=QueuedEmail.PENDING, next_attempt_at__lte=now)
+            .order_by('next_attempt_at')
+            .select_for_update(skip_locked=True)[:batch_size]
+        )
+        QueuedEmail.objects.filter(pk__in=[queued.pk for queued in due]).update(next_attempt_at=now + CLAIM_TIMEOUT)
+    return due
+
+
+def _record_failure(queued, error, now):
+    queued.attempts += 1
+    queued.last_error = f'{type(error).__name__}: {error}'
+    if queued.attempts >= _max_attempts():
+        queued.status = QueuedEmail.FAILED
+        logger.error('Giving up on email %s to %s: %s', queued.pk, queued.recipients, queued.last_error)
+    else:
+        queued.next_attempt_at = now + _retry_delay(queued.attempts)
+    queued.save(update_fields=['attempts', 'last_error', 'status', 'next_attempt_at'])
+
+
+def deliver_batch(batch_size=100, connection=None):
+    """
+    Send one batch of due messages over a single connection.
+
+    Returns (sent, failed). Failed messages are rescheduled, or marked FAILED
+    after their last attempt.
+    """
+    batch = claim_batch(batch_size)
+    if not batch:
+        return 0, 0
+
+    connection = connection or get_connection(_delivery_backend())
+    now = timezone.now()
+    sent, failed = [], 0
+    remaining = list(batch)
+    try:
+        connection.open()
+        while remaining:
+            queued = remaining.pop(0)
+            try:
+                connection.send_messages([StoredMessage(queued)])
+            except Exception as error:
+                _record_failure(queued, error, now)
+                failed += 1
+                # The server may have dropped the connection; use a fresh one for the rest
+                connection.close()
+                connection.open()
+            else:
+                sent.append(queued.pk)
+    except Exception as error:
+        # No connection to the server: the rest of the batch is retried later
+        for queued in remaining:
+            _record_failure(queued, error, now)
+        failed += len(remaining)
+    finally:
+        connection.close()
+        QueuedEmail.objects.filter(pk__in=sent).delete()
+    return len(sent), failed
+
+
+def deliver_queued_mail(batch_size=100, connection=None):
+    """Deliver every due message, batch by batch. Returns (sent, failed)."""
+    total_sent = total_failed = 0
+    while True:
+        sent, failed = deliver_batch(batch_size, connection)
+        total_sent += sent
+        total_failed += failed
+        if sent + failed < batch_size:
+            return total_sent, total_failed
@@ -0,0 +1,71 @@
+"""Helpers shared by the bench_* management commands."""
+import statistics
+import time
+from contextlib import contextmanager
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from blog_app.models import Post, Comment, Like, Category
+
+
+class _Rollback(Exception):
+    pass
+
+
+class BenchCommand(BaseCommand):
+    """Base of the bench_* commands that seed rows inside rolled_back()."""
+
+    def create_parser(self, prog_name, subcommand, **kwargs):
+        kwargs.setdefault('epilog', 'Seeded rows are rolled back afterwards.')
+        return super().create_parser(prog_name, subcommand, **kwargs)
+
+
+@contextmanager
+def rolled_back():
+    """Run the block in a transaction that is always rolled back, so seeded rows never persist."""
+    try:
+        with transaction.atomic():
+            yield
+            raise _Rollback
+    except _Rollback:
+        pass
+
+
+def seed_posts(prefix, posts, comments, likers):
+    """
+    Seed 20 users, 5 categories and `posts` posts, each in one category and liked
+    by `likers` users, with `comments` comments on the last post.
+
+    Returns the last post.
+    """
+    users = User.objects.bulk_create([User(username=f'{prefix}_{i}') for i in range(20)])
+    categories = Category.objects.bulk_create([Category(name=f'{prefix}_{i}') for i in range(5)])
+    posts = Post.objects.bulk_create(
+        [Post(title=f'Post {i}', content='Lorem ipsum dolor sit amet. ' * 40, author=users[i % 20])
+         for i in range(posts)]
+    )
+    Post.categories.through.objects.bulk_create(
+        [Post.categories.through(post=post, category=categories[post.pk % 5]) for post in posts]
+    )
+    Like.objects.bulk_create([Like(post=post, user=user) for post in posts for user in users[:likers]])
+    post = posts[-1]
+    Comment.objects.bulk_create(
+        [Comment(post=post, author=users[i % 20], content=f'Comment {i}') for i in range(comments)]
+    )
+    return post
+
+
+def timeit(func, repeat):
+    """Call func `repeat` times and return the timings in milliseconds."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def summary(timings):
+    return f'median {statistics.median(timings):8.3f} ms   min {min(timings):8.3f} ms   max {max(timings):8.3f} ms'
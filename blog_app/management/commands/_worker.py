@@ -0,0 +1,29 @@
+"""Base of the worker commands that run once from cron or keep running with --interval."""
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+
+class WorkerCommand(BaseCommand):
+    """
+    Calls run_once() once, or every --interval seconds until interrupted.
+
+    run_once() returns (work done, message). In a loop, the message is only
+    written when there was work, so an idle worker does not flood the log.
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument('--interval', type=int, default=0, help='check again every N seconds (0 = run once)')
+
+    def run_once(self, **options):
+        raise NotImplementedError('subclasses of WorkerCommand must provide a run_once() method')
+
+    def handle(self, *args, **options):
+        while True:
+            done, message = self.run_once(**options)
+            if done or not options['interval']:
+                self.stdout.write(f'{timezone.now():%Y-%m-%d %H:%M:%S} {message}')
+            if not options['interval']:
+                break
+            time.sleep(options['interval'])
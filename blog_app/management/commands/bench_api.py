@@ -0,0 +1,37 @@
+from django.test import Client
+from django.test.utils import override_settings
+
+from blog_app.views import PostListView
+from ._bench import BenchCommand, rolled_back, seed_posts, timeit, summary
+
+
+class Command(BenchCommand):
+    help = (
+        "Compare JSON API responses with the HTML pages showing the same data "
+        "(post list page and post detail with comments)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=200)
+        parser.add_argument('--comments', type=int, default=50, help='comments on the detail post')
+        parser.add_argument('--repeat', type=int, default=50)
+
+    def handle(self, *args, **options):
+        with rolled_back(), override_settings(ALLOWED_HOSTS=['testserver']):
+            post = seed_posts('bench_api', options['posts'], options['comments'], likers=5)
+
+            page = PostListView.paginate_by
+            client = Client()
+            pairs = [
+                (f'HTML post list ({page} posts)', '/posts/'),
+                (f'JSON post list ({page} posts)', f'/api/v1/posts/?limit={page}&expand=author,categories'),
+                (f'HTML post detail ({options["comments"]} comments)', f'/posts/{post.pk}/'),
+                (f'JSON post detail ({options["comments"]} comments)',
+                 f'/api/v1/posts/{post.pk}/?fields=id,title,content,created_at,author,categories,like_count,comments'
+                 f'&expand=author,categories,comments'),
+            ]
+            for label, url in pairs:
+                response = client.get(url)
+                assert response.status_code == 200, (url, response.status_code)
+                timings = timeit(lambda: client.get(url), options['repeat'])
+                self.stdout.write(f'{label:34} {len(response.content):8} bytes   {summary(timings)}')
@@ -0,0 +1,79 @@
+import random
+from collections import Counter
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.test.utils import override_settings
+
+from blog_app import timeline
+from blog_app.models import Post, TimelineEntry
+from user_accounts.models import Follow, Profile
+from ._bench import BenchCommand, rolled_back, timeit, summary
+
+
+class Command(BenchCommand):
+    help = (
+        "Compare read latency of the following feed built with fan-out-on-write "
+        "(precomputed timeline) and fan-out-on-read (join with the follow graph) "
+        "on a seeded follower graph. Both pay a fixed ORM cost, and the timeline read one "
+        "extra query for followed authors above the limit, so the timeline only pulls "
+        "ahead once the followed authors have more than a few dozen posts (see --posts)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=200)
+        parser.add_argument('--follows', type=int, default=50, help='authors followed per user')
+        parser.add_argument('--posts', type=int, default=50, help='posts per user')
+        parser.add_argument('--page', type=int, default=20, help='feed page size')
+        parser.add_argument('--repeat', type=int, default=50)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--max-followers', type=int, default=settings.TIMELINE_FANOUT_MAX_FOLLOWERS,
+            help='override TIMELINE_FANOUT_MAX_FOLLOWERS to exercise the fan-out-on-read fallback',
+        )
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        with rolled_back(), override_settings(TIMELINE_FANOUT_MAX_FOLLOWERS=options['max_followers']):
+            reader = self.seed(rng, options)
+            self.stdout.write(
+                f"{options['users']} users, {options['follows']} follows/user, {options['posts']} posts/user, "
+                f"{TimelineEntry.objects.count()} timeline entries, "
+                f"{timeline.pull_authors(reader).count()} followed authors read at fan-out-on-read"
+            )
+
+            page = options['page']
+            # The join sorts every post of the followed authors for each page; the
+            # timeline reads `page` entries off its index, whatever the history
+            joined = timeline.pull_feed_queryset(reader).count()
+            self.stdout.write(f"fan-out-on-read sorts {joined} posts per page, fan-out-on-write reads {page} timeline entries")
+            pull = lambda: list(timeline.pull_feed_queryset(reader)[:page])
+            push = lambda: list(timeline.feed_queryset(reader)[:page])
+            # Both strategies must return the same feed
+            assert set(timeline.pull_feed_queryset(reader).values_list('pk', flat=True)) == \
+                set(timeline.feed_queryset(reader).values_list('pk', flat=True))
+
+            self.stdout.write(f"fan-out-on-read   {summary(timeit(pull, options['repeat']))}")
+            self.stdout.write(f"fan-out-on-write  {summary(timeit(push, options['repeat']))}")
+
+    def seed(self, rng, options):
+        users = User.objects.bulk_create(
+            [User(username=f'bench_feed_{i}') for i in range(options['users'])]
+        )
+        follows = []
+        for user in users:
+            for author in rng.sample(users, min(options['follows'], len(users))):
+                if author != user:
+                    follows.append(Follow(follower=user, following=author))
+        # bulk_create skips the Follow signals, so no backfill happens and counts are set here
+        Follow.objects.bulk_create(follows, batch_size=5000)
+        counts = Counter(follow.following_id for follow in follows)
+        Profile.objects.bulk_create(
+            [Profile(user=user, follower_count=counts[user.pk]) for user in users], batch_size=5000
+        )
+
+        # Posts are created one by one so the post_save fan-out runs as in production
+        for n in range(options['posts']):
+            for author in users:
+                Post.objects.create(title=f'Post {n} by {author.username}', content='...', author=author)
+        return users[0]
@@ -0,0 +1,73 @@
+import time
+
+from django.contrib.auth.models import User
+from django.core.mail import EmailMessage, get_connection
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+
+from blog_app.mail import deliver_queued_mail
+from blog_app.models import QueuedEmail
+from blog_app.smtp_sink import SMTPSink
+from ._bench import BenchCommand, rolled_back, timeit, summary
+
+SMTP_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
+QUEUED_BACKEND = 'blog_app.mail.QueuedEmailBackend'
+
+
+def _message(i):
+    return EmailMessage(f'Bench {i}', 'Hello from bench_mail.', 'noreply@example.com', [f'user{i}@example.com'])
+
+
+class Command(BenchCommand):
+    help = (
+        "Compare sending email during the request (SMTP) with the queued backend, and "
+        "measure the delivery throughput of the send_queued_mail worker, against a local "
+        "SMTP sink."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=20, help='password reset requests per backend')
+        parser.add_argument('--messages', type=int, default=500, help='messages delivered in the throughput test')
+        parser.add_argument('--batch-size', type=int, default=100)
+        parser.add_argument('--latency', type=float, default=50, help='ms the sink waits before greeting a connection (handshake)')
+
+    def handle(self, *args, **options):
+        with SMTPSink(latency=options['latency'] / 1000) as sink, rolled_back(), override_settings(
+            EMAIL_HOST=sink.host, EMAIL_PORT=sink.port, EMAIL_USE_TLS=False,
+            EMAIL_HOST_USER='', EMAIL_HOST_PASSWORD='',
+            QUEUED_EMAIL_DELIVERY_BACKEND=SMTP_BACKEND, ALLOWED_HOSTS=['testserver'],
+        ):
+            User.objects.create_user('bench_mail', 'bench_mail@example.com', 'bench-password')
+            client = Client()
+            url = reverse('password_reset')
+            self.stdout.write(f"POST {url} ({options['requests']} requests, {options['latency']:.0f} ms handshake)")
+            for name, backend in (('smtp', SMTP_BACKEND), ('queued', QUEUED_BACKEND)):
+                with override_settings(EMAIL_BACKEND=backend):
+                    timings = timeit(lambda: client.post(url, {'email': 'bench_mail@example.com'}), options['requests'])
+                self.stdout.write(f'  {name:8} {summary(timings)}')
+            QueuedEmail.objects.all().delete()
+
+            n = options['messages']
+            self.stdout.write(f'\nDelivering {n} messages')
+
+            connections = sink.connections
+            start = time.perf_counter()
+            for i in range(n):
+                # What a synchronous send_mail() per request does: one connection per message
+                get_connection(SMTP_BACKEND).send_messages([_message(i)])
+            elapsed = time.perf_counter() - start
+            self.stdout.write(
+                f'  one connection per message   {n / elapsed:8.1f} msg/s   {sink.connections - connections} connections'
+            )
+
+            get_connection(QUEUED_BACKEND).send_messages([_message(i) for i in range(n)])
+            connections, received = sink.connections, len(sink.messages)
+            start = time.perf_counter()
+            sent, failed = deliver_queued_mail(options['batch_size'])
+            elapsed = time.perf_counter() - start
+            self.stdout.write(
+                f"  send_queued_mail (batch {options['batch_size']})  {sent / elapsed:8.1f} msg/s   "
+                f'{sink.connections - connections} connections, {failed} failed, '
+                f'{len(sink.messages) - received} received'
+            )
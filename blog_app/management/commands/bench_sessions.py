@@ -0,0 +1,66 @@
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+
+from blog_app.models import Post
+from ._bench import BenchCommand, rolled_back, timeit, summary
+
+ENGINES = {
+    'db': 'django.contrib.sessions.backends.db',
+    'cached_db': 'django.contrib.sessions.backends.cached_db',
+    'cache': 'django.contrib.sessions.backends.cache',
+    'signed_cookies': 'django.contrib.sessions.backends.signed_cookies',
+}
+MESSAGE_STORAGES = {
+    'session': 'django.contrib.messages.storage.session.SessionStorage',
+    'cookie': 'django.contrib.messages.storage.cookie.CookieStorage',
+}
+
+
+def session_queries(request):
+    # Captured one request at a time: the query log is reset when a request starts
+    with CaptureQueriesContext(connection) as context:
+        request()
+    return sum('django_session' in query['sql'] for query in context.captured_queries)
+
+
+class Command(BenchCommand):
+    help = (
+        "Count django_session queries per request and time authenticated page views "
+        "for each session engine and message storage."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=20, help='page views per measurement')
+
+    def handle(self, *args, **options):
+        with rolled_back():
+            user = User.objects.create_user('bench_sessions')
+            post = Post.objects.create(title='Bench', content='...', author=user)
+            n = options['requests']
+            self.stdout.write('session engine   messages  session queries/read  session queries/comment  read time')
+
+            for engine_name, engine in ENGINES.items():
+                for storage_name, storage in MESSAGE_STORAGES.items():
+                    with override_settings(
+                        SESSION_ENGINE=engine, MESSAGE_STORAGE=storage,
+                        ALLOWED_HOSTS=['testserver'], RATELIMIT_ENABLED=False,
+                    ):
+                        client = Client()
+                        client.force_login(user)
+                        client.get('/about/')  # first request may load the session into the cache
+
+                        reads = sum(session_queries(lambda: client.get('/about/')) for _ in range(n))
+                        # comment POST adds a message, the redirected GET displays it
+                        writes = sum(
+                            session_queries(lambda: client.post(f'/posts/{post.pk}/', {'comment_content': 'bench'}))
+                            + session_queries(lambda: client.get(f'/posts/{post.pk}/'))
+                            for _ in range(n)
+                        )
+
+                        timings = timeit(lambda: client.get('/about/'), n)
+                    self.stdout.write(
+                        f'{engine_name:16} {storage_name:9} {reads / n:20.2f}  '
+                        f'{writes / n:23.2f}  {summary(timings)}'
+                    )
@@ -0,0 +1,55 @@
+import os
+import subprocess
+import sys
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from ._bench import summary
+
+# A fresh worker: import the WSGI application, then serve one request
+FIRST_REQUEST_CODE = '''
+import io
+from django.conf import settings
+from django_blog_project.wsgi import application
+
+environ = {
+    'REQUEST_METHOD': 'GET', 'PATH_INFO': %(path)r, 'QUERY_STRING': '',
+    'SERVER_NAME': 'localhost', 'SERVER_PORT': '80', 'SERVER_PROTOCOL': 'HTTP/1.1',
+    'HTTP_HOST': settings.ALLOWED_HOSTS[0], 'wsgi.input': io.BytesIO(), 'wsgi.errors': io.StringIO(),
+    'wsgi.url_scheme': 'http', 'wsgi.version': (1, 0), 'wsgi.multithread': False,
+    'wsgi.multiprocess': True, 'wsgi.run_once': False,
+}
+statuses = []
+b''.join(application(environ, lambda status, headers, exc_info=None: statuses.append(status)))
+assert statuses[0].startswith('200'), statuses[0]
+'''
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure time-to-first-response of fresh worker processes: start a new "
+        "interpreter, import the WSGI application and serve one request."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=10)
+        parser.add_argument('--path', default='/about/', help='URL of the first request')
+
+    def handle(self, *args, **options):
+        code = FIRST_REQUEST_CODE % {'path': options['path']}
+        variants = [
+            ('admin enabled', {'DJANGO_ENABLE_ADMIN': '1'}),
+            ('admin disabled', {'DJANGO_ENABLE_ADMIN': '0'}),
+        ]
+        for label, env in variants:
+            timings = []
+            for _ in range(options['repeat']):
+                start = time.perf_counter()
+                subprocess.run(
+                    [sys.executable, '-c', code], cwd=settings.BASE_DIR, check=True,
+                    env={**os.environ, **env},
+                )
+                timings.append((time.perf_counter() - start) * 1000)
+            self.stdout.write(f'{label:16} {summary(timings)}')
@@ -0,0 +1,50 @@
+from django.contrib.auth.models import AnonymousUser
+from django.db import connection
+from django.template.loader import render_to_string
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+
+from blog_app.views import HomePageView, PostListView, PostDetailView
+from ._bench import BenchCommand, rolled_back, seed_posts, timeit, summary
+
+
+class Command(BenchCommand):
+    help = (
+        "Time rendering of home.html, post_list.html and post_detail.html with N posts "
+        "and M comments, and count the queries run while rendering. Each timed render builds "
+        "the view context and renders the template, as a request would after routing."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=50, help='posts on the list page')
+        parser.add_argument('--comments', type=int, default=100, help='comments on the detail page')
+        parser.add_argument('--repeat', type=int, default=50)
+
+    def handle(self, *args, **options):
+        with rolled_back():
+            post = seed_posts('bench_tpl', options['posts'], options['comments'], likers=3)
+
+            request = RequestFactory().get('/')
+            request.user = AnonymousUser()
+            list_view = PostListView(paginate_by=options['posts'])
+            cases = [
+                ('home.html', HomePageView(), {}),
+                (f'post_list.html ({options["posts"]} posts)', list_view, {}),
+                (f'post_detail.html ({options["comments"]} comments)', PostDetailView(), {'pk': post.pk}),
+            ]
+            for label, view, kwargs in cases:
+                view.setup(request, **kwargs)
+                if isinstance(view, PostDetailView):
+                    view.object = view.get_object()
+                else:
+                    view.object_list = view.get_queryset()
+                template_name = view.get_template_names()[0]
+
+                def render():
+                    # a fresh context each time, so lazy querysets are evaluated by the template as in a request
+                    return render_to_string(template_name, view.get_context_data(), request)
+
+                with CaptureQueriesContext(connection) as queries:
+                    render()
+                timings = timeit(render, options['repeat'])
+                self.stdout.write(f'{label:34} {len(queries.captured_queries):4} queries   {summary(timings)}')
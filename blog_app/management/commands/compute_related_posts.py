@@ -0,0 +1,32 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from blog_app.related import compute_related_posts
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute the related posts of every published post from shared categories "
+        "and users liking both posts. Run it periodically, e.g. nightly from cron."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--count', type=int, default=None, help='related posts kept per post (default RELATED_POSTS_COUNT)')
+        parser.add_argument('--like-weight', type=float, default=None, help='weight of co-likes vs categories, 0..1 (default RELATED_POSTS_LIKE_WEIGHT)')
+        parser.add_argument('--block-size', type=int, default=500, help='posts scored per sparse matrix product')
+
+    def handle(self, *args, **options):
+        like_weight = options['like_weight']
+        if like_weight is not None and not 0 <= like_weight <= 1:
+            raise CommandError('--like-weight must be between 0 and 1.')
+        try:
+            import numpy, scipy  # noqa: F401
+        except ImportError:
+            raise CommandError('compute_related_posts needs NumPy and SciPy: pip install -r requirements-jobs.txt')
+
+        started = time.perf_counter()
+        posts = compute_related_posts(options['count'], like_weight, options['block_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Computed related posts of {posts} posts in {time.perf_counter() - started:.1f}s.'
+        ))
@@ -0,0 +1,61 @@
+import subprocess
+import sys
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+# What a fresh web worker does before it can serve a request
+STARTUP_CODE = 'from django_blog_project.wsgi import application'
+
+
+def parse_importtime(output):
+    """
+    Parse `python -X importtime` output into {module: (self_us, cumulative_us)}.
+
+    Lines look like: "import time:       445 |        974 |   PIL"
+    """
+    modules = {}
+    for line in output.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        modules[name.strip()] = (int(self_us), int(cumulative_us))
+    return modules
+
+
+class Command(BaseCommand):
+    help = (
+        "Import the WSGI application in a fresh interpreter with -X importtime "
+        "and report the cumulative import cost per module and per top level package."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top', type=int, default=25, help='number of modules to list')
+        parser.add_argument('--code', default=STARTUP_CODE, help='python code to profile instead of the WSGI import')
+
+    def handle(self, *args, **options):
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', options['code']],
+            cwd=settings.BASE_DIR, capture_output=True, text=True,
+        )
+        if result.returncode:
+            self.stderr.write(result.stderr)
+            return
+        modules = parse_importtime(result.stderr)
+
+        # Self times summed per top level package, e.g. all of django.* or PIL.*
+        packages = defaultdict(int)
+        for name, (self_us, _) in modules.items():
+            packages[name.split('.')[0]] += self_us
+        total = sum(packages.values())
+
+        self.stdout.write(f'Total import time: {total / 1000:.1f} ms for {len(modules)} modules\n')
+        self.stdout.write('By top level package (self time):')
+        for package, self_us in sorted(packages.items(), key=lambda item: -item[1])[:options['top']]:
+            self.stdout.write(f'  {self_us / 1000:8.1f} ms  {package}')
+
+        self.stdout.write('\nSlowest modules (cumulative time, including their imports):')
+        slowest = sorted(modules.items(), key=lambda item: -item[1][1])[:options['top']]
+        for name, (self_us, cumulative_us) in slowest:
+            self.stdout.write(f'  {cumulative_us / 1000:8.1f} ms  {name}')
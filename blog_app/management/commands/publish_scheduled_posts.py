@@ -0,0 +1,44 @@
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from blog_app import category_index, timeline
+from blog_app.models import Post
+from blog_app.stats import recompute_authors_stats
+from ._worker import WorkerCommand
+
+
+def publish_due_posts(now=None):
+    """
+    Publish every scheduled post whose time has come, in one batch.
+
+    The due posts are read from the partial publish queue index and flipped
+    with a single UPDATE, which also moves their created_at (the sort key of
+    listings, feeds and the category index) to the publish time. Then their
+    timeline entries and category index rows follow, and the cached stats of
+    all affected authors are rebuilt with one aggregate query. Returns the
+    number of posts published.
+    """
+    now = now or timezone.now()
+    with transaction.atomic():
+        due = list(Post.objects.due(now).select_for_update().values_list('pk', 'author_id'))
+        if not due:
+            return 0
+        post_ids = [pk for pk, _ in due]
+        # Listed from their publish time, not from when they were written
+        Post.objects.filter(pk__in=post_ids).update(is_published=True, created_at=F('publish_at'), publish_at=None)
+        category_index.sync_posts(post_ids)
+        timeline.retime_posts(post_ids)
+        recompute_authors_stats({author_id for _, author_id in due})
+    return len(due)
+
+
+class Command(WorkerCommand):
+    help = (
+        "Publish scheduled posts whose publish_at has passed. Run it from cron, "
+        "or keep it running with --interval."
+    )
+
+    def run_once(self, **options):
+        published = publish_due_posts()
+        return published, f'published {published} scheduled post(s)'
@@ -0,0 +1,19 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+
+from blog_app.stats import recompute_author_stats
+
+
+class Command(BaseCommand):
+    help = "Recompute AuthorStats rows from scratch (all authors, or the given user ids)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('user_ids', nargs='*', type=int)
+
+    def handle(self, *args, **options):
+        user_ids = options['user_ids'] or list(
+            User.objects.filter(posts__isnull=False).distinct().values_list('pk', flat=True)
+        )
+        for user_id in user_ids:
+            recompute_author_stats(user_id)
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt stats of {len(user_ids)} authors.'))
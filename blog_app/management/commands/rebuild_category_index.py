@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from blog_app.category_index import rebuild
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the per-category post index (CategoryPost) from Post.categories. "
+        "Run it after bulk imports or raw SQL changes that bypass the signals."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=5000, help='rows inserted per query')
+
+    def handle(self, *args, **options):
+        rows = rebuild(options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Indexed {rows} category memberships of published posts.'))
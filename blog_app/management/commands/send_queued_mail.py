@@ -0,0 +1,17 @@
+from blog_app.mail import deliver_queued_mail
+from ._worker import WorkerCommand
+
+
+class Command(WorkerCommand):
+    help = (
+        "Deliver queued emails over one SMTP connection per batch. Run it from cron, "
+        "or keep it running with --interval."
+    )
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument('--batch-size', type=int, default=100, help='messages sent per SMTP connection')
+
+    def run_once(self, **options):
+        sent, failed = deliver_queued_mail(options['batch_size'])
+        return sent + failed, f'sent {sent} email(s), {failed} failed'
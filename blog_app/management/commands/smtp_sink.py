@@ -0,0 +1,30 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from blog_app.smtp_sink import SMTPSink
+
+
+class Command(BaseCommand):
+    help = (
+        "Run a local SMTP server that accepts and prints every message, instead of "
+        "delivering it. Point EMAIL_HOST/EMAIL_PORT at it with EMAIL_USE_TLS=False."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--port', type=int, default=1025)
+        parser.add_argument('--latency', type=float, default=0, help='seconds to wait before greeting each connection')
+
+    def handle(self, *args, **options):
+        sink = SMTPSink(port=options['port'], latency=options['latency']).start()
+        self.stdout.write(f'SMTP sink listening on {sink.host}:{sink.port}. Quit with CONTROL-C.')
+        shown = 0
+        try:
+            while True:
+                time.sleep(0.5)
+                for message in sink.messages[shown:]:
+                    self.stdout.write(f'--- from {message.sender} to {", ".join(message.recipients)}')
+                    self.stdout.write(message.data.decode('utf-8', 'replace'))
+                shown = len(sink.messages)
+        except KeyboardInterrupt:
+            sink.stop()
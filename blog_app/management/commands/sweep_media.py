@@ -0,0 +1,77 @@
+import os
+import time
+
+from django.apps import apps
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from django.db.models import FileField
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete uploaded media files that no model row references anymore. "
+        "Only the upload_to directories of FileField/ImageField fields are swept, "
+        "and files are checked against the database in batches."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument(
+            '--min-age', type=int, default=3600,
+            help='skip files modified less than this many seconds ago (uploads whose row is not saved yet)',
+        )
+        parser.add_argument('--dry-run', action='store_true', help='only report what would be deleted')
+
+    def handle(self, *args, **options):
+        fields = [
+            (model, field)
+            for model in apps.get_models()
+            for field in model._meta.get_fields()
+            if isinstance(field, FileField)
+        ]
+        # Field defaults (e.g. cover.jpg) are referenced implicitly by new rows
+        protected = {field.default for _, field in fields if isinstance(field.default, str)}
+        directories = {field.upload_to for _, field in fields if isinstance(field.upload_to, str)}
+
+        cutoff = time.time() - options['min_age']
+        deleted = scanned = 0
+        batch = []
+        for directory in sorted(directories):
+            for name in self.walk(directory):
+                scanned += 1
+                if name in protected or os.path.getmtime(default_storage.path(name)) > cutoff:
+                    continue
+                batch.append(name)
+                if len(batch) >= options['batch_size']:
+                    deleted += self.sweep(batch, fields, options['dry_run'])
+                    batch = []
+        if batch:
+            deleted += self.sweep(batch, fields, options['dry_run'])
+
+        verb = 'Would delete' if options['dry_run'] else 'Deleted'
+        self.stdout.write(self.style.SUCCESS(f'{verb} {deleted} of {scanned} media files.'))
+
+    def walk(self, directory):
+        if not default_storage.exists(directory):
+            return
+        subdirectories, files = default_storage.listdir(directory)
+        for name in files:
+            yield f'{directory}/{name}'
+        for subdirectory in subdirectories:
+            yield from self.walk(f'{directory}/{subdirectory}')
+
+    def sweep(self, batch, fields, dry_run):
+        referenced = set()
+        for model, field in fields:
+            referenced.update(
+                model._default_manager
+                .filter(**{f'{field.name}__in': batch})
+                .values_list(field.name, flat=True)
+            )
+        orphans = [name for name in batch if name not in referenced]
+        for name in orphans:
+            if dry_run:
+                self.stdout.write(f'would delete {name}')
+            else:
+                default_storage.delete(name)
+        return len(orphans)
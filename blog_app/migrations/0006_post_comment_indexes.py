@@ -0,0 +1,21 @@
+# Generated by Django 4.2.7 on 2026-10-19 16:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog_app', '0005_authorstats'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['post', 'created_at', 'id'], name='blog_app_co_post_id_23a6a1_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['created_at', 'id'], name='blog_app_po_created_d91c98_idx'),
+        ),
+    ]
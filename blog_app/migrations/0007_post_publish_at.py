@@ -0,0 +1,26 @@
+# Generated by Django 4.2.7 on 2026-10-19 17:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog_app', '0006_post_comment_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='publish_at',
+            field=models.DateTimeField(blank=True, help_text='Pick a future time to schedule the post. Leave empty to publish (or not) with "Is published".', null=True),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['is_published', 'created_at'], name='blog_app_po_is_publ_8fb136_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(condition=models.Q(('is_published', False), ('publish_at__isnull', False)), fields=['publish_at'], name='post_publish_queue_idx'),
+        ),
+    ]
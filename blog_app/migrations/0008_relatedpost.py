@@ -0,0 +1,28 @@
+# Generated by Django 4.2.7 on 2026-10-19 17:06
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog_app', '0007_post_publish_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RelatedPost',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rank', models.PositiveSmallIntegerField()),
+                ('score', models.FloatField()),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='related_entries', to='blog_app.post')),
+                ('related', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='blog_app.post')),
+            ],
+            options={
+                'ordering': ['post', 'rank'],
+                'unique_together': {('post', 'rank')},
+            },
+        ),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 4.2.7 on 2026-10-19 17:12
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def fill_category_index(apps, schema_editor):
+    # Same as blog_app.category_index.rebuild(), with the historical models
+    Post = apps.get_model('blog_app', 'Post')
+    CategoryPost = apps.get_model('blog_app', 'CategoryPost')
+    memberships = (
+        Post.categories.through.objects
+        .filter(post__is_published=True)
+        .values_list('post_id', 'category_id', 'post__created_at')
+        .iterator(chunk_size=5000)
+    )
+    batch = []
+    for post_id, category_id, created_at in memberships:
+        batch.append(CategoryPost(post_id=post_id, category_id=category_id, created_at=created_at))
+        if len(batch) >= 5000:
+            CategoryPost.objects.bulk_create(batch)
+            batch = []
+    CategoryPost.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog_app', '0009_queuedemail'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CategoryPost',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField()),
+                ('category', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='post_index', to='blog_app.category')),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='category_index', to='blog_app.post')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['category', 'created_at', 'post'], name='blog_app_ca_categor_c3342d_idx')],
+                'unique_together': {('category', 'post')},
+            },
+        ),
+        migrations.RunPython(fill_category_index, migrations.RunPython.noop),
+    ]
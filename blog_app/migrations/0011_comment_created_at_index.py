@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-19 17:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog_app', '0010_categorypost'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['created_at'], name='blog_app_co_created_9aecb8_idx'),
+        ),
+    ]
@@ -2,8 +2,8 @@ from django.db import models
 from django.contrib.auth.models import User
 from django.db.models.signals import pre_save
 from django.dispatch import receiver
-from PIL import Image
 from django.urls import reverse
+from django.utils import timezone
 
 class Category(models.Model):
     name = models.CharField(max_length=200, unique=True)
@@ -12,18 +12,44 @@ class Category(models.Model):
     def __str__(self):
         return self.name
 
+class PostQuerySet(models.QuerySet):
+    def published(self):
+        """
+        Posts visible to readers. Shared by every listing, feed, search and the API.
+
+        Scheduled posts are flipped to is_published by the publish_scheduled_posts
+        command, so this is a plain indexed flag check with no time comparison.
+        """
+        return self.filter(is_published=True)
+
+    def due(self, now=None):
+        """Scheduled posts whose publish time has come."""
+        # Ordered by publish_at so the partial publish queue index serves it
+        return self.filter(is_published=False, publish_at__isnull=False, publish_at__lte=now or timezone.now()).order_by('publish_at')
+
+
 class Post(models.Model):
     title = models.CharField(max_length=200)
     content = models.TextField()
-    created_at = models.DateTimeField(auto_now_add=True)
+    # Not auto_now_add, so a post created with a past publish_at can be dated from it (see save())
+    created_at = models.DateTimeField(default=timezone.now, editable=False)
     updated_at = models.DateTimeField(auto_now=True)
     author = models.ForeignKey(User, on_delete=models.CASCADE, related_name='posts')
     categories = models.ManyToManyField(Category, related_name='posts')
     is_published = models.BooleanField(default=True)
-    cover_image = models.ImageField(default='cover.jpg', upload_to='cover_pics')
+    publish_at = models.DateTimeField(null=True, blank=True, help_text='Pick a future time to schedule the post. Leave empty to publish (or not) with "Is published".')
+    cover_image = models.ImageField(default='cover.jpg', upload_to='cover_pics')  # shrunk to 1080x620 on upload, see MEDIA_IMAGE_MAX_SIZES
+
+    objects = PostQuerySet.as_manager()
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['created_at', 'id']),  # newest-first listings and API cursors
+            models.Index(fields=['is_published', 'created_at']),  # published listings
+            # The publish queue: only unpublished posts with a publish time are indexed
+            models.Index(fields=['publish_at'], name='post_publish_queue_idx', condition=models.Q(is_published=False, publish_at__isnull=False)),
+        ]
 
     def __str__(self):
         return self.title
@@ -31,18 +57,22 @@ class Post(models.Model):
     def get_absolute_url(self):
         return reverse('post-detail', kwargs={'pk': self.pk})
     
-    # resize image before saveing
+    @property
+    def is_scheduled(self):
+        return not self.is_published and self.publish_at is not None
+
     def save(self, *args, **kwargs):
+        # A post scheduled for later stays a draft until publish_scheduled_posts publishes it.
+        # Once its time has come it is published like publish_due_posts does: listed
+        # from its publish time, and publish_at cleared so is_published can be edited again.
+        if self.publish_at is not None:
+            if self.publish_at > timezone.now():
+                self.is_published = False
+            else:
+                self.is_published = True
+                self.created_at = self.publish_at
+                self.publish_at = None
         super().save(*args, **kwargs)
-        try:
-            img = Image.open(self.cover_image.path)
-            # Set a maximum size for the profile picture
-            max_size = (1080, 620)
-            if img.height > max_size[1] or img.width > max_size[0]:
-                img.thumbnail(max_size)
-                img.save(self.cover_image.path)
-        except Exception as e:
-            print("Error occured while resizing image!", e)
 
 # @receiver(pre_save, sender=Post)
 # def resize_cover_image(sender, instance, **kwargs):
@@ -69,6 +99,10 @@ class Comment(models.Model):
     
     class Meta:
         ordering = ['created_at']
+        indexes = [
+            models.Index(fields=['post', 'created_at', 'id']),  # comments of a post in order
+            models.Index(fields=['created_at']),  # date filter of the admin changelist
+        ]
 
     def __str__(self):
         return f"Comment by {str(self.author)} on {str(self.post)}"
@@ -81,4 +115,129 @@ class Like(models.Model):
         unique_together = ('post', 'user')  # Ensure each user can only like a post once.
 
     def __str__(self):
-        return f"Like by {self.user} on {self.post}"
\ No newline at end of file
+        return f"Like by {self.user} on {self.post}"
+
+
+class TimelineEntry(models.Model):
+    """
+    A precomputed row of a user's "following" feed.
+
+    Entries are written when a post is created (fan-out-on-write), so reading
+    a feed is a single indexed range scan on (user, created_at) instead of a
+    join between Post and the follow graph. Authors with more followers than
+    settings.TIMELINE_FANOUT_MAX_FOLLOWERS are not fanned out; their posts are
+    merged into the feed at read time instead (see blog_app.timeline).
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='timeline_entries')
+    post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='timeline_entries')
+    created_at = models.DateTimeField()  # copied from the post so the feed can be sorted without a join
+
+    class Meta:
+        unique_together = ('user', 'post')
+        indexes = [
+            models.Index(fields=['user', '-created_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.post} in {self.user}'s timeline"
+
+
+class AuthorStats(models.Model):
+    """
+    Per-author totals shown on the author page and dashboard: published
+    posts, and likes and comments received.
+
+    The row is updated incrementally from the Post/Like/Comment signals in
+    blog_app/signals.py and rebuilt with one aggregate query when missing
+    (see blog_app.stats), so showing it never depends on how much the author
+    has published.
+    """
+    user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='author_stats')
+    post_count = models.PositiveIntegerField(default=0)
+    likes_received = models.PositiveIntegerField(default=0)
+    comments_received = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name_plural = 'author stats'
+
+    def __str__(self):
+        return f"Stats of {self.user}"
+
+
+class RelatedPost(models.Model):
+    """
+    One of the top related posts of a post, precomputed offline by the
+    compute_related_posts command (see blog_app.related).
+
+    The detail page reads a post's rows in rank order off the (post, rank)
+    index instead of joining categories and likes on every request.
+    """
+    post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='related_entries')
+    related = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='+')
+    rank = models.PositiveSmallIntegerField()
+    score = models.FloatField()
+
+    class Meta:
+        ordering = ['post', 'rank']
+        unique_together = ('post', 'rank')
+
+    def __str__(self):
+        return f"{self.related} related to {self.post}"
+
+
+class QueuedEmail(models.Model):
+    """
+    An outgoing email waiting for the send_queued_mail worker (see blog_app.mail).
+
+    The QueuedEmailBackend stores the rendered message here instead of talking
+    to the SMTP server during the request. Rows are deleted once delivered;
+    messages that keep failing are marked FAILED after the last attempt.
+    """
+    PENDING = 'pending'
+    FAILED = 'failed'
+    STATUS_CHOICES = [(PENDING, 'Pending'), (FAILED, 'Failed')]
+
+    from_email = models.CharField(max_length=254)
+    recipients = models.JSONField()  # To, Cc and Bcc addresses
+    subject = models.CharField(max_length=255, blank=True)  # for the admin only
+    message = models.BinaryField()  # the full MIME message, as sent over SMTP
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['next_attempt_at']
+        indexes = [
+            # The send queue: only pending messages are indexed
+            models.Index(fields=['next_attempt_at'], name='email_send_queue_idx', condition=models.Q(status='pending')),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} to {', '.join(self.recipients)}"
+
+
+class CategoryPost(models.Model):
+    """
+    A published post in one of its categories, with the post's created_at copied
+    next to the category.
+
+    Category pages read a range of the (category, created_at, post) index,
+    newest first, instead of joining Post_categories with Post and sorting.
+    Rows are kept in sync by the signal receivers in blog_app/signals.py (see
+    blog_app.category_index) and can be rebuilt with rebuild_category_index.
+    """
+    category = models.ForeignKey(Category, on_delete=models.CASCADE, related_name='post_index')
+    post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='category_index')
+    created_at = models.DateTimeField()  # copied from the post so a category can be listed without a join
+
+    class Meta:
+        unique_together = ('category', 'post')
+        indexes = [
+            models.Index(fields=['category', 'created_at', 'post']),
+        ]
+
+    def __str__(self):
+        return f"{self.post} in {self.category}"
@@ -0,0 +1,124 @@
+"""
+Related posts, computed offline.
+
+Each published post is described by two sparse vectors: the categories it is
+in and the users who liked it. Both are L2 normalised, so their dot products
+are cosine similarities, and the two parts are weighted with
+settings.RELATED_POSTS_LIKE_WEIGHT:
+
+    score(a, b) = (1 - w) * cos(categories a, categories b) + w * cos(likers a, likers b)
+
+All pairs are scored at once with a sparse matrix product (SciPy), one block
+of rows at a time to bound memory. The top settings.RELATED_POSTS_COUNT posts
+of each post are stored in RelatedPost, and the detail page reads them with a
+single indexed lookup. Nothing is computed per request.
+
+NumPy and SciPy are imported only by the job, never by the web workers.
+"""
+from itertools import chain
+
+from django.conf import settings
+from django.db import transaction
+
+from .models import Like, Post, RelatedPost
+
+
+def _count() -> int:
+    return getattr(settings, 'RELATED_POSTS_COUNT', 5)
+
+
+def _like_weight() -> float:
+    return getattr(settings, 'RELATED_POSTS_LIKE_WEIGHT', 0.5)
+
+
+def _edges(queryset, np):
+    """(post id, feature id) pairs of a values_list() queryset as an n x 2 array, streamed from the database."""
+    flat = chain.from_iterable(queryset.iterator(chunk_size=10000))
+    return np.fromiter(flat, dtype=np.int64).reshape(-1, 2)
+
+
+def _feature_matrix(edges, post_ids, np, sparse):
+    """Row normalised posts x features incidence matrix."""
+    rows = np.searchsorted(post_ids, edges[:, 0])
+    _, columns = np.unique(edges[:, 1], return_inverse=True)
+    matrix = sparse.csr_matrix(
+        (np.ones(len(rows)), (rows, columns)),
+        shape=(len(post_ids), columns.max() + 1 if len(columns) else 0),
+    )
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    norms[norms == 0] = 1
+    return sparse.diags(1 / norms) @ matrix
+
+
+def _top_k(scores, columns, k, post_ids, np):
+    """(post id, score) of the k best scoring columns of one sparse row, best first."""
+    if len(scores) > k:
+        best = np.argpartition(-scores, k - 1)[:k]
+        scores, columns = scores[best], columns[best]
+    # Highest score first, newer post first on ties
+    order = np.lexsort((-post_ids[columns], -scores))
+    return [(int(post_ids[columns[i]]), float(scores[i])) for i in order]
+
+
+def compute_related_posts(k=None, like_weight=None, block_size=500):
+    """
+    Recompute the related posts of every published post.
+
+    All rows are computed first and then swapped in with one short
+    transaction, so the detail pages keep showing the previous results until
+    the new ones are complete, and writers are not blocked during the
+    computation. Returns the number of posts that got at least one related
+    post.
+    """
+    import numpy as np
+    from scipy import sparse
+
+    k = k or _count()
+    like_weight = _like_weight() if like_weight is None else like_weight
+
+    published = Post.objects.published()
+    post_ids = np.fromiter(published.order_by('pk').values_list('pk', flat=True), dtype=np.int64)
+    categories = _edges(Post.categories.through.objects.filter(post__in=published).values_list('post_id', 'category_id'), np)
+    likes = _edges(Like.objects.filter(post__in=published).values_list('post_id', 'user_id'), np)
+
+    # Weighting the blocks by the square roots makes X @ X.T the weighted sum of both cosines
+    features = sparse.hstack([
+        np.sqrt(1 - like_weight) * _feature_matrix(categories, post_ids, np, sparse),
+        np.sqrt(like_weight) * _feature_matrix(likes, post_ids, np, sparse),
+    ]).tocsr()
+    features_t = features.T.tocsc()
+
+    rows = []
+    posts_with_related = 0
+    for start in range(0, len(post_ids), block_size):
+        similarity = (features[start:start + block_size] @ features_t).tocoo()
+        # A post is not related to itself, and zero scores mean nothing in common
+        keep = (similarity.col != similarity.row + start) & (similarity.data > 0)
+        similarity = sparse.csr_matrix(
+            (similarity.data[keep], (similarity.row[keep], similarity.col[keep])), shape=similarity.shape,
+        )
+        for offset in range(similarity.shape[0]):
+            row = slice(similarity.indptr[offset], similarity.indptr[offset + 1])
+            related = _top_k(similarity.data[row], similarity.indices[row], k, post_ids, np)
+            rows.extend(
+                RelatedPost(post_id=int(post_ids[start + offset]), related_id=related_id, rank=rank, score=score)
+                for rank, (related_id, score) in enumerate(related)
+            )
+            posts_with_related += bool(related)
+
+    # Everything is computed before writing, so the write lock is only held for the swap
+    with transaction.atomic():
+        RelatedPost.objects.all().delete()
+        RelatedPost.objects.bulk_create(rows, batch_size=1000)
+    return posts_with_related
+
+
+def related_posts(post):
+    """The stored related posts of a post, best first, skipping any unpublished since the last run."""
+    entries = (
+        RelatedPost.objects
+        .filter(post=post, related__is_published=True)
+        .select_related('related', 'related__author')
+        .order_by('rank')
+    )
+    return [entry.related for entry in entries]
@@ -0,0 +1,103 @@
+from django.contrib.auth.models import User
+from django.db.models import QuerySet
+from django.db.models.signals import m2m_changed, post_save, post_delete
+from django.dispatch import receiver
+
+from user_accounts.models import Follow
+from .models import Post, Like, Comment
+from . import category_index
+from . import stats
+from . import timeline
+
+
+def _deleted_by(origin, model):
+    # origin is the instance or queryset whose delete() started the cascade
+    if isinstance(origin, QuerySet):
+        return origin.model is model
+    return isinstance(origin, model)
+
+
+@receiver(post_save, sender=Post)
+def fan_out_new_post(sender, instance, created, **kwargs):
+    if created:
+        timeline.fan_out_post(instance)
+
+
+@receiver(post_save, sender=Post)
+def count_saved_post(sender, instance, created, **kwargs):
+    # post_count only counts published posts
+    if created and not instance.is_published:
+        return
+    if not created or not stats.bump(instance.author_id, 'post_count', 1):
+        # An edit may have published or unpublished the post
+        stats.recompute_author_stats(instance.author_id)
+
+
+@receiver(post_save, sender=Post)
+def reindex_saved_post(sender, instance, created, **kwargs):
+    # A new post has no categories yet; they are indexed by index_post_categories
+    if not created:
+        category_index.sync_posts([instance.pk])
+        # Publishing a scheduled post moves created_at to the publish time
+        timeline.retime_posts([instance.pk])
+
+
+@receiver(m2m_changed, sender=Post.categories.through)
+def index_post_categories(sender, instance, action, reverse, pk_set, **kwargs):
+    # reverse: category.posts.add(...) rather than post.categories.add(...)
+    if action == 'post_clear':
+        if reverse:
+            category_index.remove(category_ids=[instance.pk])
+        else:
+            category_index.remove(post_ids=[instance.pk])
+    elif action in ('post_add', 'post_remove') and pk_set:
+        post_ids, category_ids = (pk_set, [instance.pk]) if reverse else ([instance.pk], pk_set)
+        if action == 'post_add':
+            category_index.add(post_ids, category_ids)
+        else:
+            category_index.remove(post_ids, category_ids)
+
+
+@receiver(post_delete, sender=Post)
+def recount_deleted_post(sender, instance, origin=None, **kwargs):
+    # The stats row of a deleted author goes away with the author
+    if not _deleted_by(origin, User):
+        stats.recompute_author_stats(instance.author_id)
+
+
+@receiver(post_save, sender=Like)
+def count_new_like(sender, instance, created, **kwargs):
+    if created:
+        stats.bump_for_post(instance.post_id, 'likes_received', 1)
+
+
+@receiver(post_delete, sender=Like)
+def count_deleted_like(sender, instance, origin=None, **kwargs):
+    # Likes removed along with their post are covered by recount_deleted_post
+    if not _deleted_by(origin, Post):
+        stats.bump_for_post(instance.post_id, 'likes_received', -1)
+
+
+@receiver(post_save, sender=Comment)
+def count_new_comment(sender, instance, created, **kwargs):
+    if created:
+        stats.bump_for_post(instance.post_id, 'comments_received', 1)
+
+
+@receiver(post_delete, sender=Comment)
+def count_deleted_comment(sender, instance, origin=None, **kwargs):
+    if not _deleted_by(origin, Post):
+        stats.bump_for_post(instance.post_id, 'comments_received', -1)
+
+
+@receiver(post_save, sender=Follow)
+def backfill_followed_author(sender, instance, created, **kwargs):
+    if created:
+        timeline.backfill_author(instance.follower_id, instance.following_id)
+
+
+@receiver(post_delete, sender=Follow)
+def remove_unfollowed_author(sender, instance, **kwargs):
+    timeline.remove_author(instance.follower_id, instance.following_id)
+    if timeline.left_fan_out_on_read(instance.following_id):
+        timeline.backfill_followers(instance.following_id)
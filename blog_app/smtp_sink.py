@@ -0,0 +1,131 @@
+"""
+A local SMTP server that accepts every message and keeps it in memory.
+
+It stands in for smtp.gmail.com in tests, development and bench_mail, so the
+real SMTP backend and the send_queued_mail worker can be exercised without
+network access or credentials:
+
+    with SMTPSink() as sink:
+        with override_settings(EMAIL_HOST=sink.host, EMAIL_PORT=sink.port, EMAIL_USE_TLS=False):
+            deliver_queued_mail()
+        assert sink.messages[0].recipients == ['user@example.com']
+
+`latency` (seconds) delays the greeting of every new connection, like the TCP
+and TLS handshake with a remote server; `reject` is a set of recipient
+addresses that get a permanent error, to exercise retries.
+
+There is no TLS or authentication: point EMAIL_USE_TLS=False and an empty
+EMAIL_HOST_USER at it. `python manage.py smtp_sink` runs one in the foreground.
+"""
+import socketserver
+import threading
+import time
+from collections import namedtuple
+
+ReceivedMessage = namedtuple('ReceivedMessage', 'sender recipients data')
+
+
+class _SMTPHandler(socketserver.StreamRequestHandler):
+    def reply(self, line):
+        self.wfile.write(line.encode() + b'\r\n')
+
+    def handle(self):
+        sink = self.server.sink
+        sink.connections += 1
+        if sink.latency:
+            time.sleep(sink.latency)
+        self.reply('220 localhost SMTP sink ready')
+        sender, recipients = None, []
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command, _, argument = line.decode('utf-8', 'replace').strip().partition(' ')
+            command = command.upper()
+            if command == 'EHLO':
+                self.reply('250-localhost')
+                self.reply('250 8BITMIME')
+            elif command == 'HELO':
+                self.reply('250 localhost')
+            elif command == 'MAIL':
+                sender, recipients = _address(argument), []
+                self.reply('250 OK')
+            elif command == 'RCPT':
+                recipient = _address(argument)
+                if recipient in sink.reject:
+                    self.reply('550 Mailbox unavailable')
+                else:
+                    recipients.append(recipient)
+                    self.reply('250 OK')
+            elif command == 'DATA':
+                if not recipients:
+                    self.reply('503 No valid recipients')
+                    continue
+                self.reply('354 End data with <CR><LF>.<CR><LF>')
+                data = self.read_data()
+                sink.add(ReceivedMessage(sender, recipients, data))
+                sender, recipients = None, []
+                self.reply('250 OK')
+            elif command == 'RSET':
+                sender, recipients = None, []
+                self.reply('250 OK')
+            elif command == 'NOOP':
+                self.reply('250 OK')
+            elif command == 'QUIT':
+                self.reply('221 Bye')
+                return
+            else:
+                self.reply('502 Command not implemented')
+
+    def read_data(self):
+        lines = []
+        while True:
+            line = self.rfile.readline()
+            if not line or line == b'.\r\n':
+                return b''.join(lines)
+            # Undo dot-stuffing
+            lines.append(line[1:] if line.startswith(b'..') else line)
+
+
+def _address(argument):
+    # 'FROM:<a@example.com> SIZE=123' -> 'a@example.com'
+    return argument.partition(':')[2].strip().split(' ')[0].strip('<>')
+
+
+class _Server(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class SMTPSink:
+    """SMTP server on a background thread, collecting messages in `messages`."""
+
+    def __init__(self, host='127.0.0.1', port=0, latency=0, reject=()):
+        self.latency = latency
+        self.reject = set(reject)
+        self.messages = []
+        self.connections = 0
+        self._lock = threading.Lock()
+        self._server = _Server((host, port), _SMTPHandler)
+        self._server.sink = self
+        self.host, self.port = self._server.server_address
+        self._thread = None
+
+    def add(self, message):
+        with self._lock:
+            self.messages.append(message)
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
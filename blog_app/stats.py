@@ -0,0 +1,103 @@
+"""
+Author statistics (posts written, likes and comments received).
+
+AuthorStats rows are kept current by the signal receivers in
+blog_app/signals.py. When a row is missing it is rebuilt from a single
+aggregate query, so pages never compute totals with per-post queries.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.contrib.auth.models import User
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from .models import AuthorStats, Comment, Like, Post
+
+_deferred = ContextVar('author_stats_deferred', default=False)
+
+
+def subquery_count(queryset, group_by):
+    # Scalar subquery counting rows of the queryset per outer row
+    return Coalesce(
+        Subquery(queryset.values(group_by).annotate(c=Count('pk')).values('c'), output_field=IntegerField()),
+        0,
+    )
+
+
+def _totals(users):
+    return users.annotate(
+        post_count=subquery_count(Post.objects.published().filter(author=OuterRef('pk')), 'author'),
+        likes_received=subquery_count(Like.objects.filter(post__author=OuterRef('pk')), 'post__author'),
+        comments_received=subquery_count(Comment.objects.filter(post__author=OuterRef('pk')), 'post__author'),
+    ).values('pk', 'post_count', 'likes_received', 'comments_received')
+
+
+def recompute_author_stats(user_id):
+    """Rebuild the stats row of one author from a single aggregate query."""
+    totals = _totals(User.objects.filter(pk=user_id)).first()
+    if totals is None:
+        return None
+    del totals['pk']
+    stats, _ = AuthorStats.objects.update_or_create(user_id=user_id, defaults=totals)
+    return stats
+
+
+def recompute_authors_stats(user_ids):
+    """Rebuild the stats rows of several authors with one aggregate query and one upsert."""
+    rows = [
+        AuthorStats(user_id=totals.pop('pk'), **totals)
+        for totals in _totals(User.objects.filter(pk__in=user_ids))
+    ]
+    AuthorStats.objects.bulk_create(
+        rows,
+        update_conflicts=True,
+        unique_fields=['user'],
+        update_fields=['post_count', 'likes_received', 'comments_received', 'updated_at'],
+    )
+    return len(rows)
+
+
+def get_author_stats(user):
+    """Stats of the author, rebuilding them if they were never computed."""
+    stats = AuthorStats.objects.filter(user=user).first()
+    return stats if stats is not None else recompute_author_stats(user.pk)
+
+
+def bump(user_id, field, delta):
+    """Incrementally adjust one counter of the author's stats row, if it exists."""
+    return _bump(AuthorStats.objects.filter(user_id=user_id), field, delta)
+
+
+def bump_for_post(post_id, field, delta):
+    """Adjust a counter of the stats row of the post's author, without loading the post."""
+    return _bump(AuthorStats.objects.filter(user__posts=post_id), field, delta)
+
+
+@contextmanager
+def deferred():
+    """
+    Skip the incremental updates of the signal receivers inside the block, e.g.
+    around a bulk delete; the caller recomputes the affected stats afterwards.
+    """
+    token = _deferred.set(True)
+    try:
+        yield
+    finally:
+        _deferred.reset(token)
+
+
+def _bump(queryset, field, delta):
+    if _deferred.get():
+        return 1  # counted as done: the caller of deferred() recomputes
+    if delta < 0:
+        queryset = queryset.filter(**{f'{field}__gte': -delta})
+    return queryset.update(**{field: F(field) + delta})
+
+
+def with_counts(posts):
+    """Annotate a post queryset with like_count and comment_count without joining likes and comments."""
+    return posts.annotate(
+        like_count=subquery_count(Like.objects.filter(post=OuterRef('pk')), 'post'),
+        comment_count=subquery_count(Comment.objects.filter(post=OuterRef('pk')), 'post'),
+    )
@@ -1,3 +1,558 @@
-from django.test import TestCase
+import threading
+from datetime import timedelta
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from django.contrib import admin
+from django.contrib.auth.models import User
+from django.core.mail import EmailMessage, get_connection, send_mail
+from django.db import connection, models
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from django_blog_project.ratelimit import CacheBackend, Policy, get_backend
+from user_accounts.models import Follow, Profile
+
+try:
+    import numpy, scipy  # noqa: F401  (only needed by compute_related_posts)
+except ImportError:
+    numpy = None
+
+from . import timeline
+from .admin import LikeAdmin
+from .category_index import rebuild
+from .mail import deliver_queued_mail
+from .management.commands.publish_scheduled_posts import publish_due_posts
+from .models import AuthorStats, Category, CategoryPost, Comment, Like, Post, QueuedEmail, RelatedPost, TimelineEntry
+from .related import compute_related_posts, related_posts
+from .smtp_sink import SMTPSink
+from .stats import recompute_author_stats
+
+
+@override_settings(EMAIL_BACKEND='blog_app.mail.QueuedEmailBackend')
+class QueuedEmailTests(TestCase):
+    def setUp(self):
+        self.sink = SMTPSink(reject={'bad@example.com'}).start()
+        self.addCleanup(self.sink.stop)
+        smtp = override_settings(
+            EMAIL_HOST=self.sink.host, EMAIL_PORT=self.sink.port, EMAIL_USE_TLS=False,
+            EMAIL_HOST_USER='', EMAIL_HOST_PASSWORD='',
+            QUEUED_EMAIL_DELIVERY_BACKEND='django.core.mail.backends.smtp.EmailBackend',
+            QUEUED_EMAIL_MAX_ATTEMPTS=2,
+        )
+        smtp.enable()
+        self.addCleanup(smtp.disable)
+
+    def test_send_mail_is_queued_not_sent(self):
+        send_mail('Hello', 'Body', 'from@example.com', ['to@example.com'])
+        self.assertEqual(QueuedEmail.objects.count(), 1)
+        self.assertEqual(self.sink.messages, [])
+
+    def test_delivers_in_batches_over_one_connection_each(self):
+        get_connection().send_messages([
+            EmailMessage(f'Message {i}', 'Body', 'from@example.com', [f'user{i}@example.com'])
+            for i in range(25)
+        ])
+
+        self.assertEqual(deliver_queued_mail(batch_size=10), (25, 0))
+        self.assertEqual(len(self.sink.messages), 25)
+        self.assertEqual(self.sink.connections, 3)
+        self.assertFalse(QueuedEmail.objects.exists())  # delivered messages are deleted
+        self.assertEqual(self.sink.messages[0].recipients, ['user0@example.com'])
+
+    def test_rejected_message_is_retried_then_failed(self):
+        send_mail('Good', 'Body', 'from@example.com', ['good@example.com'])
+        send_mail('Bad', 'Body', 'from@example.com', ['bad@example.com'])
+
+        self.assertEqual(deliver_queued_mail(), (1, 1))
+        queued = QueuedEmail.objects.get()
+        self.assertEqual(queued.status, QueuedEmail.PENDING)
+        self.assertEqual(queued.attempts, 1)
+        self.assertGreater(queued.next_attempt_at, timezone.now())
+        self.assertIn('SMTPRecipientsRefused', queued.last_error)
+
+        # Not due yet
+        self.assertEqual(deliver_queued_mail(), (0, 0))
+
+        QueuedEmail.objects.update(next_attempt_at=timezone.now())
+        with self.assertLogs('blog_app.mail', 'ERROR'):
+            self.assertEqual(deliver_queued_mail(), (0, 1))
+        queued.refresh_from_db()
+        self.assertEqual(queued.status, QueuedEmail.FAILED)
+        self.assertEqual(queued.attempts, 2)
+        self.assertEqual([message.recipients for message in self.sink.messages], [['good@example.com']])
+
+        # Failed messages are not picked up again
+        QueuedEmail.objects.update(next_attempt_at=timezone.now())
+        self.assertEqual(deliver_queued_mail(), (0, 0))
+
+    def test_unreachable_server_reschedules_the_batch(self):
+        send_mail('Hello', 'Body', 'from@example.com', ['to@example.com'])
+        with override_settings(EMAIL_PORT=1):
+            self.assertEqual(deliver_queued_mail(), (0, 1))
+        queued = QueuedEmail.objects.get()
+        self.assertEqual((queued.status, queued.attempts), (QueuedEmail.PENDING, 1))
+
+
+class AuthorStatsSignalTests(TestCase):
+    def setUp(self):
+        self.author = User.objects.create_user('author')
+        self.reader = User.objects.create_user('reader')
+        self.post = Post.objects.create(title='Post', content='...', author=self.author)
+        recompute_author_stats(self.author.pk)
+
+    def assertStatsConsistent(self):
+        stats = AuthorStats.objects.get(user=self.author)
+        expected = recompute_author_stats(self.author.pk)
+        self.assertEqual(
+            (stats.post_count, stats.likes_received, stats.comments_received),
+            (expected.post_count, expected.likes_received, expected.comments_received),
+        )
+        return stats
+
+    def test_likes_and_comments_are_counted(self):
+        like = Like.objects.create(post=self.post, user=self.reader)
+        Comment.objects.create(post=self.post, author=self.reader, content='Nice')
+        stats = self.assertStatsConsistent()
+        self.assertEqual((stats.likes_received, stats.comments_received), (1, 1))
+
+        like.delete()
+        self.assertEqual(self.assertStatsConsistent().likes_received, 0)
+
+    def test_only_published_posts_are_counted(self):
+        draft = Post.objects.create(title='Draft', content='...', author=self.author, is_published=False)
+        self.assertEqual(self.assertStatsConsistent().post_count, 1)
+
+        draft.is_published = True
+        draft.save()
+        self.assertEqual(self.assertStatsConsistent().post_count, 2)
+
+    def test_deleting_a_post_removes_its_likes_and_comments(self):
+        Like.objects.create(post=self.post, user=self.reader)
+        Comment.objects.create(post=self.post, author=self.reader, content='Nice')
+        self.post.delete()
+        stats = self.assertStatsConsistent()
+        self.assertEqual((stats.post_count, stats.likes_received, stats.comments_received), (0, 0, 0))
+
+
+class CategoryIndexSignalTests(TestCase):
+    def setUp(self):
+        self.author = User.objects.create_user('author')
+        self.python, self.django = Category.objects.create(name='Python'), Category.objects.create(name='Django')
+        self.post = Post.objects.create(title='Post', content='...', author=self.author)
+
+    def assertIndexConsistent(self):
+        indexed = set(CategoryPost.objects.values_list('category_id', 'post_id', 'created_at'))
+        expected = set(
+            Post.categories.through.objects
+            .filter(post__is_published=True)
+            .values_list('category_id', 'post_id', 'post__created_at')
+        )
+        self.assertEqual(indexed, expected)
+        return indexed
+
+    def test_follows_category_changes(self):
+        self.post.categories.add(self.python, self.django)
+        self.assertEqual(len(self.assertIndexConsistent()), 2)
+
+        self.post.categories.remove(self.django)
+        self.assertEqual(len(self.assertIndexConsistent()), 1)
+
+        self.django.posts.add(self.post)  # reverse side
+        self.assertEqual(len(self.assertIndexConsistent()), 2)
+
+        self.python.posts.clear()
+        self.assertEqual(len(self.assertIndexConsistent()), 1)
+
+        self.post.categories.clear()
+        self.assertEqual(len(self.assertIndexConsistent()), 0)
+
+    def test_only_published_posts_are_indexed(self):
+        self.post.categories.add(self.python)
+        self.post.is_published = False
+        self.post.save()
+        self.assertEqual(len(self.assertIndexConsistent()), 0)
+
+        self.post.is_published = True
+        self.post.save()
+        self.assertEqual(len(self.assertIndexConsistent()), 1)
+
+    def test_scheduled_post_is_indexed_from_its_publish_time(self):
+        scheduled = Post.objects.create(
+            title='Later', content='...', author=self.author, publish_at=timezone.now() + timedelta(days=7),
+        )
+        scheduled.categories.add(self.python)
+        self.post.categories.add(self.python)
+        self.assertEqual(len(self.assertIndexConsistent()), 1)
+
+        publish_due_posts(timezone.now() + timedelta(days=8))
+        self.assertEqual(len(self.assertIndexConsistent()), 2)
+        newest = CategoryPost.objects.filter(category=self.python).order_by('-created_at').first()
+        self.assertEqual(newest.post_id, scheduled.pk)
+
+    def test_rebuild_matches_signals(self):
+        self.post.categories.add(self.python, self.django)
+        indexed = self.assertIndexConsistent()
+        CategoryPost.objects.all().delete()
+        self.assertEqual(rebuild(), 2)
+        self.assertEqual(self.assertIndexConsistent(), indexed)
+
+
+@override_settings(
+    ALLOWED_HOSTS=['testserver'],
+    RATELIMIT_BACKEND='django_blog_project.ratelimit.MemoryBackend',
+    RATELIMITS={'comment': {'rate': '10/m', 'burst': 3}, 'like': {'rate': '10/m', 'burst': 2}},
+)
+class RateLimitTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('reader')
+        self.post = Post.objects.create(title='Post', content='...', author=User.objects.create_user('author'))
+        self.client.force_login(self.user)
+        get_backend().clear()
+        self.now = 1_000_000.0
+        clock = mock.patch('django_blog_project.ratelimit.time.time', side_effect=lambda: self.now)
+        clock.start()
+        self.addCleanup(clock.stop)
+
+    def comment(self):
+        return self.client.post(f'/posts/{self.post.pk}/', {'comment_content': 'Nice'})
+
+    def like(self):
+        return self.client.post(f'/posts/{self.post.pk}/', {'like_button': ''})
+
+    def assertLimited(self, request):
+        with self.assertLogs('django.request', 'WARNING'):
+            response = request()
+        self.assertEqual(response.status_code, 429)
+        return response
+
+    def test_burst_then_429_with_retry_after(self):
+        for _ in range(3):
+            self.assertEqual(self.comment().status_code, 302)
+        response = self.assertLimited(self.comment)
+        self.assertEqual(response['Retry-After'], '7')  # one token every 6 seconds, rounded up
+        self.assertEqual(Comment.objects.count(), 3)
+
+    def test_bucket_refills(self):
+        for _ in range(3):
+            self.comment()
+        self.assertLimited(self.comment)
+
+        self.now += 6
+        self.assertEqual(self.comment().status_code, 302)
+        self.assertLimited(self.comment)
+
+        self.now += 60  # full again, but never above the burst
+        for _ in range(3):
+            self.assertEqual(self.comment().status_code, 302)
+        self.assertLimited(self.comment)
+
+    def test_comment_and_like_scopes_are_separate(self):
+        for _ in range(3):
+            self.comment()
+        self.assertLimited(self.comment)
+        self.assertEqual(self.like().status_code, 302)
+        self.assertTrue(Like.objects.filter(post=self.post, user=self.user).exists())
+
+
+@override_settings(
+    CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'ratelimit-tests'}},
+    RATELIMIT_CACHE='default',
+)
+class CacheBackendTests(TestCase):
+    def setUp(self):
+        self.backend = CacheBackend()
+        self.backend.cache.clear()
+        self.policy = Policy('10/m', burst=5)
+        self.now = 1_000_000.0
+
+    def take(self, now=None):
+        return self.backend.take('rl:test', self.policy, self.now if now is None else now)
+
+    def test_burst_then_reject(self):
+        self.assertEqual([self.take()[0] for _ in range(5)], [True] * 5)
+        allowed, retry_after = self.take()
+        self.assertFalse(allowed)
+        self.assertAlmostEqual(retry_after, 6)
+
+    def test_rejected_requests_give_their_token_back(self):
+        for _ in range(5):
+            self.take()
+        for _ in range(10):
+            self.assertFalse(self.take()[0])
+        # One refill interval later exactly one request gets through, as if none had been rejected
+        self.assertEqual([self.take(self.now + 6)[0] for _ in range(2)], [True, False])
+
+    def test_full_bucket_restarts_from_now(self):
+        self.take()
+        # Long idle: the stored time is in the past, the bucket is full again but no fuller
+        later = self.now + 3600
+        self.assertEqual([self.take(later)[0] for _ in range(6)], [True] * 5 + [False])
+
+    def test_parallel_requests_never_exceed_the_burst(self):
+        results = []
+        barrier = threading.Barrier(50)
+
+        def request():
+            barrier.wait()
+            results.append(self.take()[0])
+
+        threads = [threading.Thread(target=request) for _ in range(50)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(results.count(True), 5)
+
+
+@override_settings(ALLOWED_HOSTS=['testserver'])
+class ApiTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        authors = [User.objects.create_user(f'author{i}') for i in range(3)]
+        category = Category.objects.create(name='Python')
+        start = timezone.now() - timedelta(days=30)
+        cls.posts = []
+        for i in range(7):
+            post = Post.objects.create(title=f'Post {i}', content='Body ' * 50, author=authors[i % 3])
+            post.categories.add(category)
+            Like.objects.create(post=post, user=authors[(i + 1) % 3])
+            Comment.objects.create(post=post, author=authors[(i + 2) % 3], content=f'Comment {i}')
+            cls.posts.append(post)
+        # Posts 2 and 3 share a timestamp, so the cursor has to break the tie on id
+        for i, post in enumerate(cls.posts):
+            Post.objects.filter(pk=post.pk).update(created_at=start + timedelta(days=min(i, 2) if i < 4 else i))
+        cls.category = category
+        cls.draft = Post.objects.create(title='Draft', content='...', author=authors[0], is_published=False)
+        cls.draft.categories.add(category)
+        Comment.objects.create(post=cls.draft, author=authors[1], content='Early comment')
+
+    def get(self, url, **extra):
+        return self.client.get(f'/api/v1/{url}', **extra)
+
+    def test_cursor_walk_returns_every_published_post_once(self):
+        expected = list(Post.objects.published().order_by('-created_at', '-pk').values_list('pk', flat=True))
+        seen, url = [], 'posts/?limit=3&fields=id'
+        while url:
+            data = self.get(url).json()
+            seen += [post['id'] for post in data['results']]
+            url = data['next'] and f"posts/?limit=3&fields=id&cursor={data['next']}"
+        self.assertEqual(seen, expected)
+        self.assertNotIn(self.draft.pk, seen)
+
+    def test_fields_narrow_the_select(self):
+        with CaptureQueriesContext(connection) as queries:
+            data = self.get('posts/?fields=id,title').json()
+        self.assertEqual(set(data['results'][0]), {'id', 'title'})
+        self.assertEqual(len(queries.captured_queries), 1)
+        sql = queries.captured_queries[0]['sql']
+        self.assertIn('"blog_app_post"."title"', sql)
+        self.assertNotIn('"blog_app_post"."content"', sql)
+
+    def test_bad_parameters_are_400(self):
+        for url in ('posts/?limit=abc', 'posts/?limit=0', 'posts/?cursor=not-a-cursor',
+                    'posts/?category=abc', 'posts/?fields=password'):
+            with self.subTest(url=url), self.assertLogs('django.request', 'WARNING'):
+                response = self.get(url)
+                self.assertEqual(response.status_code, 400)
+                self.assertIn('detail', response.json())
+
+    def test_if_none_match_is_304(self):
+        response = self.get('posts/')
+        self.assertEqual(self.get('posts/', HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+        self.assertEqual(self.get('posts/', HTTP_IF_NONE_MATCH='"stale"').status_code, 200)
+
+    def test_expand_runs_no_per_row_queries(self):
+        # posts with author and counts, categories, comments with their authors
+        with self.assertNumQueries(3):
+            data = self.get('posts/?fields=id,author,categories,comments,like_count&expand=author,categories,comments').json()
+        self.assertEqual(len(data['results']), 7)
+        post = data['results'][0]
+        self.assertEqual(set(post['author']), {'id', 'username'})
+        self.assertEqual(post['categories'], [{'id': self.category.pk, 'name': 'Python'}])
+        self.assertEqual(post['comments'][0]['author']['username'], 'author2')
+        self.assertEqual(post['like_count'], 1)
+
+    def test_drafts_are_hidden(self):
+        listed = [post['id'] for post in self.get(f'posts/?category={self.category.pk}').json()['results']]
+        self.assertNotIn(self.draft.pk, listed)
+        with self.assertLogs('django.request', 'WARNING'):
+            self.assertEqual(self.get(f'posts/{self.draft.pk}/').status_code, 404)
+        with self.assertLogs('django.request', 'WARNING'):
+            self.assertEqual(self.get(f'posts/{self.draft.pk}/comments/').status_code, 404)
+        self.assertEqual(self.get(f'posts/{self.posts[0].pk}/').status_code, 200)
+
+
+@override_settings(TIMELINE_FANOUT_MAX_FOLLOWERS=2)
+class TimelineTests(TestCase):
+    def setUp(self):
+        self.author = User.objects.create_user('author')
+        self.readers = [User.objects.create_user(f'reader{i}') for i in range(3)]
+
+    def follow(self, reader):
+        return Follow.objects.create(follower=reader, following=self.author)
+
+    def post(self, title):
+        return Post.objects.create(title=title, content='...', author=self.author)
+
+    def pushed(self, reader):
+        return set(TimelineEntry.objects.filter(user=reader).values_list('post__title', flat=True))
+
+    def feed(self, reader):
+        titles = list(timeline.feed_queryset(reader).values_list('title', flat=True))
+        # Whatever the strategy, the feed is the read-time join of the follow graph
+        self.assertEqual(titles, list(timeline.pull_feed_queryset(reader).values_list('title', flat=True)))
+        return titles
+
+    def test_new_posts_are_pushed_to_followers(self):
+        self.follow(self.readers[0])
+        self.post('First')
+        self.assertEqual(self.pushed(self.readers[0]), {'First'})
+        self.assertEqual(self.pushed(self.readers[1]), set())
+        self.assertEqual(self.feed(self.readers[0]), ['First'])
+
+    def test_follow_backfills_and_unfollow_removes(self):
+        self.post('Old')
+        follow = self.follow(self.readers[0])
+        self.assertEqual(self.pushed(self.readers[0]), {'Old'})
+
+        follow.delete()
+        self.assertEqual(self.pushed(self.readers[0]), set())
+        self.assertEqual(self.feed(self.readers[0]), [])
+
+    def test_popular_author_is_merged_at_read_time(self):
+        for reader in self.readers:
+            self.follow(reader)
+        self.assertTrue(timeline.is_fanned_out_on_read(self.author.pk))
+        self.post('Popular')
+        self.assertFalse(TimelineEntry.objects.filter(post__title='Popular').exists())
+        self.assertEqual(list(timeline.pull_authors(self.readers[0]).values_list('following_id', flat=True)), [self.author.pk])
+        self.assertEqual(self.feed(self.readers[0]), ['Popular'])
+
+    def test_crossing_the_limit_both_ways(self):
+        self.follow(self.readers[0])
+        self.follow(self.readers[1])
+        self.post('Pushed')
+
+        # Above the limit: the new follower gets no backfill and new posts are not pushed
+        self.follow(self.readers[2])
+        self.post('Pulled')
+        self.assertEqual(self.pushed(self.readers[2]), set())
+        self.assertEqual(self.pushed(self.readers[0]), {'Pushed'})
+        self.assertEqual(self.feed(self.readers[2]), ['Pulled', 'Pushed'])
+
+        # Back at the limit: everything written meanwhile is pushed to every follower
+        Follow.objects.get(follower=self.readers[0]).delete()
+        self.assertFalse(timeline.is_fanned_out_on_read(self.author.pk))
+        self.assertEqual(self.pushed(self.readers[1]), {'Pushed', 'Pulled'})
+        self.assertEqual(self.pushed(self.readers[2]), {'Pushed', 'Pulled'})
+        self.assertEqual(self.feed(self.readers[2]), ['Pulled', 'Pushed'])
+        self.post('Pushed again')
+        self.assertEqual(self.pushed(self.readers[2]), {'Pushed', 'Pulled', 'Pushed again'})
+
+    def test_switch_back_does_not_depend_on_follower_count(self):
+        for reader in self.readers:
+            self.follow(reader)
+        self.post('Pulled')
+        # The switch back is decided by the Follow rows, not by the denormalized count
+        Profile.objects.filter(user=self.author).update(follower_count=10)
+        Follow.objects.filter(follower=self.readers[0]).first().delete()
+        self.assertEqual(self.pushed(self.readers[1]), {'Pulled'})
+
+
+@skipUnless(numpy, 'compute_related_posts needs NumPy and SciPy (requirements-jobs.txt)')
+class RelatedPostsTests(TestCase):
+    def setUp(self):
+        author = User.objects.create_user('author')
+        self.readers = [User.objects.create_user(f'reader{i}') for i in range(3)]
+        python, django, cooking = (Category.objects.create(name=name) for name in ('Python', 'Django', 'Cooking'))
+        self.posts = {}
+        for title, categories, is_published in (
+            ('a', [python, django], True),
+            ('b', [python, django], True),    # same categories as a
+            ('c', [python], True),            # one category in common with a
+            ('d', [cooking], True),           # nothing in common
+            ('draft', [python, django], False),
+        ):
+            post = Post.objects.create(title=title, content='...', author=author, is_published=is_published)
+            post.categories.add(*categories)
+            self.posts[title] = post
+
+    def related(self, title):
+        return [post.title for post in related_posts(self.posts[title])]
+
+    def test_ranked_by_shared_categories(self):
+        self.assertEqual(compute_related_posts(like_weight=0), 3)
+        self.assertEqual(self.related('a'), ['b', 'c'])
+        self.assertEqual(self.related('c'), ['b', 'a'])  # tie: newer post first
+        self.assertEqual(self.related('d'), [])
+        self.assertFalse(RelatedPost.objects.filter(post=self.posts['draft']).exists())
+        self.assertFalse(RelatedPost.objects.filter(related=self.posts['draft']).exists())
+
+    def test_ranked_by_shared_likers(self):
+        for reader in self.readers:
+            Like.objects.create(post=self.posts['a'], user=reader)
+            Like.objects.create(post=self.posts['d'], user=reader)
+        Like.objects.create(post=self.posts['c'], user=self.readers[0])
+        compute_related_posts(like_weight=1)
+        self.assertEqual(self.related('a'), ['d', 'c'])
+
+    def test_never_related_to_itself(self):
+        compute_related_posts(like_weight=0.5)
+        self.assertTrue(RelatedPost.objects.exists())
+        self.assertFalse(RelatedPost.objects.filter(post=models.F('related')).exists())
+
+    def test_unpublished_posts_are_skipped_until_the_next_run(self):
+        compute_related_posts(like_weight=0)
+        Post.objects.filter(pk=self.posts['b'].pk).update(is_published=False)
+        self.assertEqual(self.related('a'), ['c'])
+
+
+class LikeAdminTests(TestCase):
+    def test_delete_selected_fast_deletes_in_batches_and_recounts(self):
+        authors = [User.objects.create_user(f'author{i}') for i in range(2)]
+        readers = User.objects.bulk_create([User(username=f'reader{i}') for i in range(1300)])
+        posts = [Post.objects.create(title=f'Post {i}', content='...', author=authors[i]) for i in range(2)]
+        Like.objects.bulk_create([Like(post=post, user=reader) for post in posts for reader in readers])
+        for author in authors:
+            recompute_author_stats(author.pk)
+
+        model_admin = LikeAdmin(Like, admin.site)
+        with mock.patch.object(model_admin, 'message_user') as message_user:
+            model_admin.delete_selected_fast(RequestFactory().post('/'), Like.objects.filter(post=posts[0]))
+
+        message_user.assert_called_once()
+        self.assertIn('1300 like(s) deleted', message_user.call_args[0][1])
+        self.assertFalse(Like.objects.filter(post=posts[0]).exists())
+        self.assertEqual(Like.objects.filter(post=posts[1]).count(), 1300)
+        self.assertEqual(AuthorStats.objects.get(user=authors[0]).likes_received, 0)
+        self.assertEqual(AuthorStats.objects.get(user=authors[1]).likes_received, 1300)
+
+
+class ScheduledPublishingTests(TestCase):
+    def setUp(self):
+        self.authors = [User.objects.create_user(f'author{i}') for i in range(3)]
+        self.reader = User.objects.create_user('reader')
+        Follow.objects.create(follower=self.reader, following=self.authors[0])
+
+    def test_post_created_with_a_past_publish_at_is_dated_from_it(self):
+        publish_at = timezone.now() - timedelta(days=3)
+        post = Post.objects.create(title='Late', content='...', author=self.authors[0], publish_at=publish_at)
+        post.refresh_from_db()
+        self.assertEqual((post.created_at, post.is_published, post.publish_at), (publish_at, True, None))
+        self.assertEqual(TimelineEntry.objects.get(user=self.reader, post=post).created_at, publish_at)
+
+    def test_publish_due_posts_recounts_all_authors_at_once(self):
+        publish_at = timezone.now() + timedelta(hours=1)
+        for author in self.authors:
+            Post.objects.create(title='Later', content='...', author=author, publish_at=publish_at)
+            recompute_author_stats(author.pk)
+
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(publish_due_posts(publish_at), 3)
+        stats_queries = [query['sql'] for query in queries.captured_queries if 'blog_app_authorstats' in query['sql']]
+        self.assertEqual(len(stats_queries), 1)
+        self.assertEqual(
+            list(AuthorStats.objects.order_by('user_id').values_list('post_count', flat=True)), [1, 1, 1],
+        )
+        self.assertEqual(TimelineEntry.objects.get(user=self.reader).created_at, publish_at)
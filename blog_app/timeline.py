@@ -0,0 +1,163 @@
+"""
+Following feed ("posts from authors I follow").
+
+The feed is a hybrid of two strategies:
+
+- fan-out-on-write: when a post is created, one TimelineEntry row is written
+  for each follower of the author, so reading a feed is a single indexed scan.
+- fan-out-on-read: authors with more than TIMELINE_FANOUT_MAX_FOLLOWERS
+  followers are skipped on write (one post would mean millions of rows), and
+  their posts are merged into the feed when it is read. Follower counts are
+  read from the denormalized Profile.follower_count.
+
+When an author drops back to the limit, their recent posts are pushed to all
+their followers (backfill_followers), so posts written and follows made while
+the author was fanned out on read do not vanish from the feeds.
+"""
+from django.conf import settings
+from django.db.models import OuterRef, Q, Subquery
+
+from user_accounts.models import Follow, Profile
+from .models import Post, TimelineEntry
+
+
+def _max_followers() -> int:
+    return getattr(settings, 'TIMELINE_FANOUT_MAX_FOLLOWERS', 1000)
+
+
+def _batch_size() -> int:
+    return getattr(settings, 'TIMELINE_FANOUT_BATCH_SIZE', 1000)
+
+
+def _backfill_size() -> int:
+    return getattr(settings, 'TIMELINE_BACKFILL_SIZE', 50)
+
+
+def is_fanned_out_on_read(author_id) -> bool:
+    return Profile.objects.filter(user_id=author_id, follower_count__gt=_max_followers()).exists()
+
+
+def pull_authors(user):
+    """ids of followed authors whose posts are not pushed to the user's timeline."""
+    return (
+        Follow.objects
+        .filter(follower=user, following__profile__follower_count__gt=_max_followers())
+        .values('following_id')
+    )
+
+
+def fan_out_post(post):
+    """Push a new post into the timeline of every follower of its author."""
+    if is_fanned_out_on_read(post.author_id):
+        return
+
+    follower_ids = (
+        Follow.objects
+        .filter(following_id=post.author_id)
+        .values_list('follower_id', flat=True)
+        .iterator(chunk_size=_batch_size())
+    )
+    batch = []
+    for follower_id in follower_ids:
+        batch.append(TimelineEntry(user_id=follower_id, post=post, created_at=post.created_at))
+        if len(batch) >= _batch_size():
+            TimelineEntry.objects.bulk_create(batch, ignore_conflicts=True)
+            batch = []
+    if batch:
+        TimelineEntry.objects.bulk_create(batch, ignore_conflicts=True)
+
+
+def _recent_posts(author_id):
+    return list(
+        Post.objects.filter(author_id=author_id).order_by('-created_at').values_list('pk', 'created_at')[:_backfill_size()]
+    )
+
+
+def backfill_author(follower_id, author_id):
+    """Copy the author's recent posts into the timeline of a new follower."""
+    if is_fanned_out_on_read(author_id):
+        return
+
+    TimelineEntry.objects.bulk_create(
+        [TimelineEntry(user_id=follower_id, post_id=pk, created_at=created_at) for pk, created_at in _recent_posts(author_id)],
+        ignore_conflicts=True,
+    )
+
+
+def left_fan_out_on_read(author_id) -> bool:
+    """Whether the author, after losing a follower, has just dropped back to the follower limit."""
+    # Counts the Follow rows (at most limit + 1) rather than reading follower_count,
+    # so the answer does not depend on whether user_accounts' receiver ran first
+    limit = _max_followers()
+    return Follow.objects.filter(following_id=author_id)[:limit + 1].count() == limit
+
+
+def backfill_followers(author_id):
+    """
+    Copy the author's recent posts into the timeline of every follower.
+
+    Called when the author goes back to fan-out-on-write: their posts written
+    meanwhile, and followers who followed meanwhile, were never pushed.
+    """
+    posts = _recent_posts(author_id)
+    if not posts:
+        return
+    follower_ids = (
+        Follow.objects
+        .filter(following_id=author_id)
+        .values_list('follower_id', flat=True)
+        .iterator(chunk_size=_batch_size())
+    )
+    batch = []
+    for follower_id in follower_ids:
+        batch.extend(TimelineEntry(user_id=follower_id, post_id=pk, created_at=created_at) for pk, created_at in posts)
+        if len(batch) >= _batch_size():
+            TimelineEntry.objects.bulk_create(batch, ignore_conflicts=True)
+            batch = []
+    if batch:
+        TimelineEntry.objects.bulk_create(batch, ignore_conflicts=True)
+
+
+def retime_posts(post_ids):
+    """Copy the (possibly changed) created_at of the posts to their timeline entries, e.g. after publishing."""
+    created_at = Subquery(Post.objects.filter(pk=OuterRef('post_id')).values('created_at')[:1])
+    TimelineEntry.objects.filter(post_id__in=post_ids).exclude(created_at=created_at).update(created_at=created_at)
+
+
+def remove_author(follower_id, author_id):
+    """Drop the author's posts from the timeline of a former follower."""
+    TimelineEntry.objects.filter(user_id=follower_id, post__author_id=author_id).delete()
+
+
+def feed_queryset(user):
+    """Posts for the user's following feed, newest first."""
+    pull_ids = list(pull_authors(user).values_list('following_id', flat=True))
+    if not pull_ids:
+        # Everything was pushed: read straight off the (user, -created_at) index
+        return (
+            Post.objects
+            .published()
+            .filter(timeline_entries__user=user)
+            .select_related('author')
+            .order_by('-timeline_entries__created_at')
+        )
+
+    pushed = TimelineEntry.objects.filter(user=user).values('post_id')
+    return (
+        Post.objects
+        .published()
+        .filter(Q(pk__in=pushed) | Q(author_id__in=pull_ids))
+        .select_related('author')
+        .order_by('-created_at')
+    )
+
+
+def pull_feed_queryset(user):
+    """The same feed computed purely at read time, by joining posts with the follow graph."""
+    return (
+        Post.objects
+        .published()
+        .filter(author__followers__follower=user)
+        .select_related('author')
+        .order_by('-created_at')
+    )
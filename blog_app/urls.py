@@ -7,11 +7,17 @@ from .views import (
     PostUpdateView,
     PostDeleteView,
     AboutView,
+    FeedView,
+    AuthorDetailView,
+    AuthorDashboardView,
 )
 
 urlpatterns = [
     path('', HomePageView.as_view(), name='home'),
     path('about/', AboutView.as_view(), name='about'),
+    path('feed/', FeedView.as_view(), name='feed'),
+    path('dashboard/', AuthorDashboardView.as_view(), name='author-dashboard'),
+    path('authors/<int:pk>/', AuthorDetailView.as_view(), name='author-detail'),
     path('posts/', PostListView.as_view(), name='post-list'),
     path('posts/<int:pk>/', PostDetailView.as_view(), name='post-detail'),
     path('posts/<int:pk>/update/', PostUpdateView.as_view(), name='post-update'),
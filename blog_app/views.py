@@ -16,6 +16,13 @@ from .models import (
     Category,
     Comment
     )
+from .timeline import feed_queryset
+from .related import related_posts
+from .category_index import category_post_ids
+from .stats import get_author_stats, with_counts
+from django.contrib.auth.models import User
+from django_blog_project.ratelimit import RateLimitMixin
+from user_accounts.models import Follow
 
 from django.contrib.auth.mixins import (
     LoginRequiredMixin,
@@ -37,6 +44,24 @@ logger = logging.getLogger(__name__)
 
 
 # views here.
+class PageLinksMixin:
+    """
+    Context of partials/pagination.html: page_range lists only the pages around
+    the current one (big categories have thousands), and page_query keeps the
+    other GET parameters, like the category and search filters, in the links.
+    """
+
+    def get_context_data(self, **kwargs: Any) -> dict[str, Any]:
+        context = super().get_context_data(**kwargs)
+        filters = self.request.GET.copy()
+        filters.pop('page', None)
+        context['page_query'] = f'&{filters.urlencode()}' if filters else ''
+        page = context.get('page_obj')
+        if page is not None:
+            context['page_range'] = range(max(page.number - 1, 1), min(page.number + 1, page.paginator.num_pages) + 1)
+        return context
+
+
 class HomePageView(ListView):
     model = Post
     template_name = 'blog_app/home.html'
@@ -46,8 +71,14 @@ class HomePageView(ListView):
         context = super().get_context_data(**kwargs)
         try:
             context['title'] = 'Blog Home'
-            context['recent_posts'] = Post.objects.all().order_by('-created_at')[:5]
-            most_liked_posts = Post.objects.annotate(like_count=models.Count('likes')).order_by('-like_count')[:3]
+            context['recent_posts'] = with_counts(Post.objects.published().select_related('author')).order_by('-created_at')[:5]
+            most_liked_posts = (
+                Post.objects.published()
+                .annotate(like_count=models.Count('likes'))
+                .select_related('author')
+                .prefetch_related('categories')
+                .order_by('-like_count')[:3]
+            )
             context['featured_posts'] = most_liked_posts
             context['categories'] = Category.objects.all()
             return context
@@ -66,8 +97,9 @@ class HomePageView(ListView):
 
         return context
     
-class PostListView(ListView):
+class PostListView(PageLinksMixin, ListView):
     model = Post
+    template_name = 'blog_app/post_list.html'  # category pages list CategoryPost ids, see get_queryset()
     context_object_name = "posts"
     paginate_by = 3
     
@@ -104,15 +136,24 @@ class PostListView(ListView):
             context['error_message'] = "An unexpected error occurred while processing your request."
         return context
     
+    def post_cards(self, queryset):
+        # like counts, authors and categories of the post cards are loaded here, not per card
+        return with_counts(queryset).select_related('author').prefetch_related('categories')
+
     def get_queryset(self) -> QuerySet[Any]:
-        queryset = super().get_queryset()
         category_id = self.request.GET.get('category')
         search_query = self.request.GET.get('search')
 
         try:
-            # Apply category filter
+            # Apply category filter: page through the ids in the category index,
+            # the posts of the page are loaded in paginate_queryset()
             if category_id:
-                queryset = queryset.filter(categories__id=category_id)
+                queryset = category_post_ids(int(category_id))
+                if search_query:
+                    queryset = queryset.filter(post__title__icontains=search_query)
+                return queryset
+
+            queryset = self.post_cards(Post.objects.published())
 
             # Apply search filter
             if search_query:
@@ -120,6 +161,9 @@ class PostListView(ListView):
 
             return queryset
 
+        except ValueError:
+            raise Http404('Invalid category.')
+
         except ObjectDoesNotExist as e:
             # Handle the specific exceptions expect to encounter
             logger.error(f"Error retrieving queryset data for PostListView: {e}")
@@ -131,11 +175,70 @@ class PostListView(ListView):
             logger.exception(f"Uncaught exception in PostListView: {e}")
             # may want to set an error message in the context here if needed
             raise e  # Re-raise the exception to stop further execution
-            
+
+    def paginate_queryset(self, queryset, page_size):
+        paginator, page, object_list, is_paginated = super().paginate_queryset(queryset, page_size)
+        if queryset.model is not Post:
+            # A page of post ids from the category index: load just those posts, in index order
+            posts = self.post_cards(Post.objects.filter(pk__in=list(object_list))).in_bulk()
+            object_list = page.object_list = [posts[pk] for pk in object_list if pk in posts]
+        return paginator, page, object_list, is_paginated
+
+
+class FeedView(LoginRequiredMixin, PageLinksMixin, ListView):
+    template_name = 'blog_app/feed.html'
+    context_object_name = 'posts'
+    paginate_by = 5
+
+    def get_queryset(self) -> QuerySet[Any]:
+        # Precomputed timeline entries, plus posts of very popular authors merged at read time
+        return with_counts(feed_queryset(self.request.user)).prefetch_related('categories')
+
+    def get_context_data(self, **kwargs: Any) -> dict[str, Any]:
+        context = super().get_context_data(**kwargs)
+        context['title'] = 'My Feed'
+        return context
+
+
+class AuthorDetailView(PageLinksMixin, ListView):
+    template_name = 'blog_app/author_detail.html'
+    context_object_name = 'posts'
+    paginate_by = 5
+    show_drafts = False
+
+    def get_author(self):
+        return get_object_or_404(User, pk=self.kwargs['pk'])
+
+    def get_queryset(self) -> QuerySet[Any]:
+        self.author = self.get_author()
+        # per-post like and comment counts come from the same query as the posts
+        posts = Post.objects.filter(author=self.author)
+        return with_counts(posts if self.show_drafts else posts.published())
+
+    def get_context_data(self, **kwargs: Any) -> dict[str, Any]:
+        context = super().get_context_data(**kwargs)
+        context['author'] = self.author
+        context['stats'] = get_author_stats(self.author)
+        context['title'] = f'Author-{self.author}'
+        return context
+
+
+class AuthorDashboardView(LoginRequiredMixin, AuthorDetailView):
+    show_drafts = True
+
+    def get_author(self):
+        return self.request.user
+
+    def get_context_data(self, **kwargs: Any) -> dict[str, Any]:
+        context = super().get_context_data(**kwargs)
+        context['is_dashboard'] = True
+        context['title'] = 'Dashboard'
+        return context
+
 
 class PostCreateView(LoginRequiredMixin,CreateView):
     model = Post
-    fields = ['title', 'content', 'categories', 'is_published', 'cover_image']
+    fields = ['title', 'content', 'categories', 'is_published', 'publish_at', 'cover_image']
     
     def get_context_data(self, **kwargs: Any) -> dict[str, Any]:
         context = super().get_context_data(**kwargs)
@@ -148,15 +251,39 @@ class PostCreateView(LoginRequiredMixin,CreateView):
         return super().form_valid(form)   
     
 
-class PostDetailView(DetailView):
+class PostDetailView(RateLimitMixin, DetailView):
     model = Post
     context_object_name = 'post'
+
+    def visible_posts(self) -> QuerySet[Any]:
+        # Drafts and scheduled posts are only visible to their author
+        if self.request.user.is_authenticated:
+            return Post.objects.filter(models.Q(is_published=True) | models.Q(author=self.request.user))
+        return Post.objects.published()
+
+    def get_queryset(self) -> QuerySet[Any]:
+        # Everything the template shows, without per-comment author queries
+        return (
+            with_counts(self.visible_posts().select_related('author'))
+            .prefetch_related('categories', models.Prefetch('comments', queryset=Comment.objects.select_related('author')))
+        )
+
+    def get_ratelimit_scope(self):
+        # Comments and likes have separate limits (see RATELIMITS in settings)
+        if 'comment_content' in self.request.POST:
+            return 'comment'
+        if 'like_button' in self.request.POST:
+            return 'like'
+        return None
     
     def get_context_data(self, **kwargs: Any) -> dict[str, Any]:
         context = super().get_context_data(**kwargs)
         post = context['post']
         # Check if the user is authenticated before checking likes
         context['is_liked'] = post.likes.filter(user=self.request.user).exists() if self.request.user.is_authenticated else False
+        context['is_following'] = Follow.objects.filter(follower=self.request.user, following=post.author_id).exists() if self.request.user.is_authenticated else False
+        # Precomputed by compute_related_posts; one indexed lookup on (post, rank)
+        context['related_posts'] = related_posts(post)
         context['title'] = f'Post-{post.title}'
         return context
     
@@ -164,7 +291,7 @@ class PostDetailView(DetailView):
         # Handling comment submission
         if 'comment_content' in self.request.POST:
             if self.request.user.is_authenticated:
-                post = self.get_object()
+                post = self.get_object(self.visible_posts())  # no need for the prefetched comments here
                 comment_content = self.request.POST['comment_content']
                 Comment.objects.create(post=post, author=request.user, content=comment_content)
                 messages.success(request, 'Comment added successfully.')
@@ -176,7 +303,7 @@ class PostDetailView(DetailView):
         # Handling like button click
         if 'like_button' in self.request.POST:
             if self.request.user.is_authenticated:
-                post = self.get_object()
+                post = self.get_object(self.visible_posts())  # no need for the prefetched comments here
                 # Check if the user already liked the post
                 if not Like.objects.filter(post=post, user=request.user).exists():
                     Like.objects.create(post=post, user=request.user)
@@ -193,7 +320,7 @@ class PostDetailView(DetailView):
     
 class PostUpdateView(UserPassesTestMixin, UpdateView):
     model = Post
-    fields = ['title', 'content', 'categories', 'is_published', 'cover_image']
+    fields = ['title', 'content', 'categories', 'is_published', 'publish_at', 'cover_image']
     
     def get_context_data(self, **kwargs: Any) -> dict[str, Any]:
         context = super().get_context_data(**kwargs)
@@ -0,0 +1,37 @@
+"""
+Image processing for uploaded pictures.
+
+Pillow is imported inside the functions, so web workers only pay for it the
+first time an image is actually processed, not when the models are imported.
+"""
+import io
+import logging
+
+from django.core.files.base import ContentFile
+
+logger = logging.getLogger(__name__)
+
+
+def shrink_image(content, max_size):
+    """
+    Shrink uploaded image content to fit in max_size (width, height), keeping its aspect ratio.
+
+    Returns new content holding the smaller image, or `content` itself when it
+    already fits or is not an image Pillow can read.
+    """
+    from PIL import Image
+
+    try:
+        with Image.open(content) as img:
+            if img.height <= max_size[1] and img.width <= max_size[0]:
+                return content
+            image_format = img.format
+            img.thumbnail(max_size)
+            output = io.BytesIO()
+            img.save(output, format=image_format)
+        return ContentFile(output.getvalue(), name=content.name)
+    except Exception as e:
+        logger.error(f"Error occured while resizing image {content.name}: {e}")
+        return content
+    finally:
+        content.seek(0)
@@ -0,0 +1,185 @@
+"""
+Token bucket rate limiting for write endpoints (comments, likes, login, registration).
+
+Each client (user id when logged in, IP address otherwise) gets one bucket per
+scope. A bucket holds up to `burst` tokens and refills at `rate`; every request
+takes one token and is rejected with 429 when the bucket is empty. Checking a
+limit is a few atomic cache operations on a single number, whatever the
+traffic.
+
+Policies are configured in settings.RATELIMITS:
+
+    RATELIMITS = {
+        'comment': {'rate': '10/m', 'burst': 5},
+    }
+
+Bucket state lives in the cache backend (settings.RATELIMIT_CACHE), which must
+be shared by all workers (Redis or Memcached); use MemoryBackend through
+settings.RATELIMIT_BACKEND in tests.
+"""
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.http import HttpResponse
+from django.utils.module_loading import import_string
+
+_PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+def parse_rate(rate):
+    """'10/m' -> tokens refilled per second."""
+    count, period = rate.split('/')
+    return int(count) / _PERIODS[period]
+
+
+class Policy:
+    def __init__(self, rate, burst=None):
+        self.rate = parse_rate(rate)
+        self.burst = burst if burst is not None else int(rate.split('/')[0])
+
+    def take(self, state, now):
+        """
+        Take one token from the bucket state (tokens, last_update).
+
+        Returns (allowed, new_state, retry_after_seconds).
+        """
+        tokens, last = state if state is not None else (self.burst, now)
+        tokens = min(self.burst, tokens + (now - last) * self.rate)
+        if tokens >= 1:
+            return True, (tokens - 1, now), 0
+        return False, (tokens, now), (1 - tokens) / self.rate
+
+
+class CacheBackend:
+    """
+    Bucket state in a Django cache, shared by all workers using that cache.
+
+    The bucket is kept as a single number, the time (in ms) at which it will be
+    full again ("theoretical arrival time", GCRA), and is only changed with the
+    cache's atomic add()/incr()/decr(): taking a token adds one refill interval.
+    Parallel requests therefore never read the same state and all get through.
+    Needs a cache whose incr() is atomic and shared between workers, such as
+    Redis or Memcached (see CACHES in settings).
+    """
+
+    def __init__(self):
+        self.cache = caches[getattr(settings, 'RATELIMIT_CACHE', 'default')]
+
+    def take(self, key, policy, now):
+        now_ms = int(now * 1000)
+        interval = max(int(1000 / policy.rate), 1)  # ms per token
+        capacity = policy.burst * interval
+        # Keep the key until the bucket would be full again
+        timeout = int(policy.burst / policy.rate) + 1
+
+        self.cache.add(key, now_ms, timeout=timeout)
+        try:
+            full_at = self.cache.incr(key, interval)
+        except ValueError:  # expired between add() and incr()
+            self.cache.add(key, now_ms + interval, timeout=timeout)
+            full_at = now_ms + interval
+        if full_at - interval < now_ms:
+            # The bucket had refilled completely; restart from now. Concurrent
+            # requests can only race here while the bucket is full.
+            full_at = now_ms + interval
+            self.cache.set(key, full_at, timeout=timeout)
+        if full_at - now_ms > capacity:
+            # Bucket empty: give the token back, so rejected requests do not count
+            self.cache.decr(key, interval)
+            return False, (full_at - now_ms - capacity) / 1000
+        self.cache.touch(key, timeout=timeout)
+        return True, 0
+
+
+class MemoryBackend:
+    """Process local bucket state, for tests and single process development servers."""
+
+    def __init__(self):
+        self.buckets = {}
+        self.lock = threading.Lock()
+
+    def take(self, key, policy, now):
+        with self.lock:
+            allowed, self.buckets[key], retry_after = policy.take(self.buckets.get(key), now)
+        return allowed, retry_after
+
+    def clear(self):
+        with self.lock:
+            self.buckets.clear()
+
+
+_backend = None
+_policies = {}
+
+
+@receiver(setting_changed)
+def _reset(setting, **kwargs):
+    # Pick up override_settings() in tests
+    global _backend
+    if setting.startswith('RATELIMIT'):
+        _backend = None
+        _policies.clear()
+
+
+def get_backend():
+    global _backend
+    if _backend is None:
+        _backend = import_string(getattr(settings, 'RATELIMIT_BACKEND', 'django_blog_project.ratelimit.CacheBackend'))()
+    return _backend
+
+
+def get_policy(scope):
+    if scope not in _policies:
+        config = getattr(settings, 'RATELIMITS', {}).get(scope)
+        _policies[scope] = Policy(**config) if config else None
+    return _policies[scope]
+
+
+def client_key(request):
+    if request.user.is_authenticated:
+        return f'user:{request.user.pk}'
+    return f"ip:{request.META.get('REMOTE_ADDR', '')}"
+
+
+def check(request, scope):
+    """
+    Take a token for this request from the client's bucket of the given scope.
+
+    Returns None when the request may proceed, or the seconds to wait otherwise.
+    """
+    policy = get_policy(scope)
+    if policy is None or not getattr(settings, 'RATELIMIT_ENABLED', True):
+        return None
+    allowed, retry_after = get_backend().take(f'rl:{scope}:{client_key(request)}', policy, time.time())
+    return None if allowed else retry_after
+
+
+def too_many_requests(retry_after):
+    response = HttpResponse('Too many requests. Please try again later.', status=429, content_type='text/plain')
+    response['Retry-After'] = str(int(retry_after) + 1)
+    return response
+
+
+class RateLimitMixin:
+    """
+    Rate limit the POST requests of a class based view.
+
+    Set `ratelimit_scope` to a key of settings.RATELIMITS, or override
+    get_ratelimit_scope() when the scope depends on the request.
+    """
+    ratelimit_scope = None
+
+    def get_ratelimit_scope(self):
+        return self.ratelimit_scope
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method == 'POST':
+            scope = self.get_ratelimit_scope()
+            retry_after = check(request, scope) if scope else None
+            if retry_after is not None:
+                return too_many_requests(retry_after)
+        return super().dispatch(request, *args, **kwargs)
@@ -34,8 +34,12 @@ ALLOWED_HOSTS = [
 
 # Application definition
 
+# The admin (and every app's admin.py, autodiscovered at startup) can be left
+# out of the public web workers with DJANGO_ENABLE_ADMIN=0 and served by a
+# separate worker pool instead, which makes those workers start faster.
+ENABLE_ADMIN = os.environ.get('DJANGO_ENABLE_ADMIN', '1') == '1'
+
 INSTALLED_APPS = [
-    'django.contrib.admin',
     'django.contrib.auth',
     'django.contrib.contenttypes',
     'django.contrib.sessions',
@@ -49,6 +53,8 @@ INSTALLED_APPS = [
     'crispy_forms',
     "crispy_bootstrap4",
 ]
+if ENABLE_ADMIN:
+    INSTALLED_APPS.insert(0, 'django.contrib.admin')
 
 # Django crispy forms configarations
 CRISPY_ALLOWED_TEMPLATE_PACKS = "bootstrap4"
@@ -66,12 +72,22 @@ MIDDLEWARE = [
 
 ROOT_URLCONF = 'django_blog_project.urls'
 
+# Templates are compiled once per process and kept in memory by the cached
+# loader, with DEBUG on as well: runserver's autoreloader clears the cache when
+# a template file changes, so edits still show up without a restart.
+TEMPLATE_LOADERS = [
+    ('django.template.loaders.cached.Loader', [
+        'django.template.loaders.filesystem.Loader',
+        'django.template.loaders.app_directories.Loader',
+    ]),
+]
+
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [],
-        'APP_DIRS': True,
         'OPTIONS': {
+            'loaders': TEMPLATE_LOADERS,
             'context_processors': [
                 'django.template.context_processors.debug',
                 'django.template.context_processors.request',
@@ -96,6 +112,47 @@ DATABASES = {
 }
 
 
+# Cache
+# Rate limit buckets and cached_db sessions must be shared by every worker
+# process, so production needs a shared cache: set REDIS_URL (e.g.
+# redis://localhost:6379/0, needs the redis package). Without it each process
+# gets its own in-memory cache, and rate limits are multiplied by the number
+# of workers; that is only suitable for development.
+REDIS_URL = os.environ.get('REDIS_URL')
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        },
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        },
+    }
+
+# Sessions and messages
+# SESSION_STORAGE picks where session data lives:
+#   'db'             - django_session table, read on every authenticated request (Django default)
+#   'cached_db'      - write-through cache in front of the table; reads normally hit the cache only
+#   'cache'          - cache only; needs a shared cache (not LocMem) when running several workers
+#   'signed_cookies' - signed cookie on the client; no server side storage at all
+# Compare the modes with: python manage.py bench_sessions
+SESSION_STORAGE = os.environ.get('SESSION_STORAGE', 'cached_db')
+SESSION_ENGINE = {
+    'db': 'django.contrib.sessions.backends.db',
+    'cached_db': 'django.contrib.sessions.backends.cached_db',
+    'cache': 'django.contrib.sessions.backends.cache',
+    'signed_cookies': 'django.contrib.sessions.backends.signed_cookies',
+}[SESSION_STORAGE]
+
+# Flash messages (messages.success(...) etc.) travel in a cookie instead of
+# being written into the session on every redirect
+MESSAGE_STORAGE = 'django.contrib.messages.storage.cookie.CookieStorage'
+
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 
@@ -144,6 +201,22 @@ STATIC_ROOT = os.path.join(BASE_DIR, 'static')
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# Uploads are named by content hash so identical files are stored once.
+# Orphaned files are removed with: python manage.py sweep_media
+# Images uploaded to these directories are shrunk to fit (width, height) before they are stored
+MEDIA_IMAGE_MAX_SIZES = {
+    'cover_pics': (1080, 620),
+    'profile_pics': (300, 300),
+}
+STORAGES = {
+    'default': {
+        'BACKEND': 'django_blog_project.storage.ContentAddressedStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage',
+    },
+}
+
 LOGIN_REDIRECT_URL = '/'
 
 # Default primary key field type
@@ -151,8 +224,38 @@ LOGIN_REDIRECT_URL = '/'
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Following feed (blog_app.timeline)
+# Authors with more followers than this are not fanned out on write;
+# their posts are merged into followers' feeds at read time instead.
+TIMELINE_FANOUT_MAX_FOLLOWERS = 1000
+TIMELINE_FANOUT_BATCH_SIZE = 1000
+# Number of recent posts copied into a timeline when a user follows an author
+TIMELINE_BACKFILL_SIZE = 50
+
+# Related posts (blog_app.related), recomputed by: python manage.py compute_related_posts
+RELATED_POSTS_COUNT = 5
+# Share of the similarity coming from users liking both posts; the rest comes from shared categories
+RELATED_POSTS_LIKE_WEIGHT = 0.5
+
+# Rate limiting of POST requests (django_blog_project/ratelimit.py)
+# Token bucket per user (or IP address when anonymous) and scope:
+# 'rate' is how fast tokens refill ('<count>/<s|m|h|d>'), 'burst' is the bucket size.
+RATELIMIT_ENABLED = True
+RATELIMIT_BACKEND = 'django_blog_project.ratelimit.CacheBackend'  # MemoryBackend for tests
+RATELIMIT_CACHE = 'default'
+RATELIMITS = {
+    'comment': {'rate': '10/m', 'burst': 5},
+    'like': {'rate': '30/m', 'burst': 10},
+    'login': {'rate': '5/m', 'burst': 5},
+    'register': {'rate': '5/h', 'burst': 3},
+}
+
 # For password reset through email
-EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
+# Outgoing mail is stored in the database during the request and delivered by
+# python manage.py send_queued_mail over the SMTP settings below (blog_app.mail).
+EMAIL_BACKEND = 'blog_app.mail.QueuedEmailBackend'
+QUEUED_EMAIL_DELIVERY_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
+QUEUED_EMAIL_MAX_ATTEMPTS = 5
 EMAIL_HOST = 'smtp.gmail.com'
 EMAIL_PORT = 587
 EMAIL_USE_TLS = True
@@ -0,0 +1,52 @@
+"""
+Content addressed media storage.
+
+Uploaded files are named after the SHA-256 of their content, for example
+`cover_pics/3f/3fa2...c9.jpg`, so uploading the same image twice stores it once
+and every model row points at the same file. Because files can be shared, they
+are never deleted together with a row; `python manage.py sweep_media` removes
+files no row references anymore.
+
+Images uploaded to a directory listed in settings.MEDIA_IMAGE_MAX_SIZES are
+shrunk before they are hashed, so a name always matches the stored content.
+"""
+import hashlib
+import os
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+
+from .images import shrink_image
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    hash_algorithm = 'sha256'
+
+    def content_name(self, name, content):
+        digest = hashlib.new(self.hash_algorithm)
+        for chunk in content.chunks():
+            digest.update(chunk)
+        content.seek(0)
+        hexdigest = digest.hexdigest()
+        directory = os.path.dirname(name)
+        extension = os.path.splitext(name)[1].lower()
+        return os.path.join(directory, hexdigest[:2], hexdigest + extension)
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+        max_size = getattr(settings, 'MEDIA_IMAGE_MAX_SIZES', {}).get(os.path.dirname(name))
+        if max_size is not None:
+            content = shrink_image(content, max_size)
+        name = self.content_name(name, content)
+        if self.exists(name):
+            # Identical content is already stored. Mark it as fresh, so sweep_media
+            # does not delete it before the row that is about to reference it is saved.
+            os.utime(self.path(name))
+            return name
+        # In the rare race where two identical uploads both get here, the
+        # second one is stored under a suffixed name; both stay referenced.
+        return super().save(name, content, max_length=max_length)
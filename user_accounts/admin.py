@@ -1,4 +1,22 @@
 from django.contrib import admin
-from .models import Profile
 
-admin.site.register(Profile)
\ No newline at end of file
+from django_blog_project.pagination import EstimatedCountPaginator
+from .models import Profile, Follow
+
+
+@admin.register(Profile)
+class ProfileAdmin(admin.ModelAdmin):
+    list_display = ('user', 'date_of_birth', 'follower_count')
+    list_select_related = ('user',)
+    search_fields = ('=user__username',)
+    raw_id_fields = ('user',)
+
+
+@admin.register(Follow)
+class FollowAdmin(admin.ModelAdmin):
+    list_display = ('id', 'follower', 'following', 'created_at')
+    list_select_related = ('follower', 'following')
+    search_fields = ('=follower__username', '=following__username')
+    raw_id_fields = ('follower', 'following')
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
@@ -1,12 +1,12 @@
 from django.db import models
 from django.contrib.auth.models import User
 from django.urls import reverse
-from PIL import Image
 
 class Profile(models.Model):
     user = models.OneToOneField(User, on_delete=models.CASCADE)
     date_of_birth = models.DateField(null=True, blank=True, verbose_name = 'Date of birth') # verbose name is for display in admin interface and other forms
-    profile_pic = models.ImageField(default='default_pic.png', upload_to='profile_pics')
+    profile_pic = models.ImageField(default='default_pic.png', upload_to='profile_pics') # shrunk to 300x300 on upload, see MEDIA_IMAGE_MAX_SIZES
+    follower_count = models.PositiveIntegerField(default=0, editable=False) # kept up to date by Follow signals
     
     def __str__(self) -> str:
         return f'{self.user}'
@@ -24,16 +24,17 @@ class Profile(models.Model):
             str: The absolute URL for the Profile object.
         """
         return reverse('profiles:profile-detail', args=[str(self.pk)])
-    
-    def save(self, *args, **kwargs):
-        super().save(*args, **kwargs)
-        try:
-            img = Image.open(self.profile_pic.path)
 
-            # Set a maximum size for the profile picture
-            max_size = (300, 300)
-            if img.height > max_size[1] or img.width > max_size[0]:
-                img.thumbnail(max_size)
-                img.save(self.profile_pic.path)
-        except Exception as e:
-            print("Error occured while resizing image!", e)
\ No newline at end of file
+class Follow(models.Model):
+    follower = models.ForeignKey(User, on_delete=models.CASCADE, related_name='following')
+    following = models.ForeignKey(User, on_delete=models.CASCADE, related_name='followers')
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ('follower', 'following')  # A user can follow another user only once.
+        indexes = [
+            models.Index(fields=['following', 'follower']),  # follower lookups during fan-out
+        ]
+
+    def __str__(self) -> str:
+        return f'{self.follower} follows {self.following}'
@@ -0,0 +1,19 @@
+from django.db.models import F
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .models import Profile, Follow
+
+
+@receiver(post_save, sender=Follow)
+def increment_follower_count(sender, instance, created, **kwargs):
+    if created:
+        updated = Profile.objects.filter(user_id=instance.following_id).update(follower_count=F('follower_count') + 1)
+        if not updated:
+            # Users created outside the registration view (e.g. createsuperuser) have no profile yet
+            Profile.objects.create(user_id=instance.following_id, follower_count=Follow.objects.filter(following_id=instance.following_id).count())
+
+
+@receiver(post_delete, sender=Follow)
+def decrement_follower_count(sender, instance, **kwargs):
+    Profile.objects.filter(user_id=instance.following_id, follower_count__gt=0).update(follower_count=F('follower_count') - 1)
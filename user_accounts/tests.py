@@ -1,3 +1,29 @@
+from django.contrib.auth.models import User
 from django.test import TestCase
 
-# Create your tests here.
+from .models import Follow, Profile
+
+
+class FollowerCountSignalTests(TestCase):
+    def setUp(self):
+        self.author = User.objects.create_user('author')
+        self.readers = [User.objects.create_user(f'reader{i}') for i in range(3)]
+
+    def follower_count(self):
+        return Profile.objects.get(user=self.author).follower_count
+
+    def test_follow_and_unfollow_update_the_count(self):
+        # The author has no profile yet: the first follow creates it with the right count
+        for reader in self.readers:
+            Follow.objects.create(follower=reader, following=self.author)
+        self.assertEqual(self.follower_count(), 3)
+
+        Follow.objects.get(follower=self.readers[0], following=self.author).delete()
+        self.assertEqual(self.follower_count(), 2)
+        self.assertEqual(self.follower_count(), self.author.followers.count())
+
+    def test_count_never_goes_negative(self):
+        follow = Follow.objects.create(follower=self.readers[0], following=self.author)
+        Profile.objects.filter(user=self.author).update(follower_count=0)
+        follow.delete()
+        self.assertEqual(self.follower_count(), 0)
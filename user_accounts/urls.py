@@ -2,12 +2,14 @@
 from django.urls import path
 from user_accounts import views as user_accounts_views
 from django.contrib.auth import views as auth_views
-from .views import UserProfileView, UserProfileUpdateView, MyLoginView
+from .views import UserProfileView, UserProfileUpdateView, MyLoginView, FollowToggleView
 
 urlpatterns = [
     path('profile/<int:pk>/', UserProfileView.as_view(), name = 'profile-detail'),
     path('profile/<int:pk>/update/', UserProfileUpdateView.as_view(), name = 'user_profile_update'),
     
+    path('follow/<int:pk>/', FollowToggleView.as_view(), name = 'follow-toggle'),
+    
     path('register/', user_accounts_views.UserRegistrationView.as_view(), name='register'),
     path('login/', MyLoginView.as_view(), name = 'login'),
     path('logout/', auth_views.LogoutView.as_view(template_name="user_accounts/logout.html"), name = 'logout'),
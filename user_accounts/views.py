@@ -1,9 +1,11 @@
 from typing import Any
-from django.shortcuts import redirect
+from django.shortcuts import redirect, get_object_or_404
+from django.utils.http import url_has_allowed_host_and_scheme
 from django.urls import reverse, reverse_lazy
 from django.contrib import messages
 from django.contrib.auth.models import User
-from .models import Profile
+from .models import Profile, Follow
+from django_blog_project.ratelimit import RateLimitMixin
 from django.contrib.auth.mixins import LoginRequiredMixin
 from .forms import ( 
         UserRegisterForm,
@@ -11,6 +13,7 @@ from .forms import (
         ProfileUpdateForm 
         )
 from django.views.generic import (
+    View,
     CreateView,
     DetailView,
     UpdateView
@@ -21,7 +24,8 @@ from django.contrib.auth.views import (
     )
 
 
-class UserRegistrationView(CreateView):
+class UserRegistrationView(RateLimitMixin, CreateView):
+    ratelimit_scope = 'register'
     form_class = UserRegisterForm
     template_name = 'user_accounts/register.html'
     context_object_name = 'form'
@@ -97,7 +101,8 @@ class UserProfileUpdateView(LoginRequiredMixin, UpdateView):
             return self.render_to_response(self.get_context_data(user_form=user_form, profile_form=profile_form))
         
         
-class MyLoginView(LoginView):
+class MyLoginView(RateLimitMixin, LoginView):
+    ratelimit_scope = 'login'
     redirect_authenticated_user = True
     template_name = 'user_accounts/login.html'
     
@@ -106,4 +111,24 @@ class MyLoginView(LoginView):
     
     def form_invalid(self, form):
         messages.error(self.request,'Invalid username or password')
-        return self.render_to_response(self.get_context_data(form=form))
\ No newline at end of file
+        return self.render_to_response(self.get_context_data(form=form))
+
+
+class FollowToggleView(LoginRequiredMixin, View):
+    # Follow the user if not followed yet, otherwise unfollow
+    def post(self, request, *args, **kwargs):
+        author = get_object_or_404(User, pk=kwargs['pk'])
+        if author == request.user:
+            messages.warning(request, 'You can not follow yourself.')
+        else:
+            follow, created = Follow.objects.get_or_create(follower=request.user, following=author)
+            if created:
+                messages.success(request, f'You are now following {author}.')
+            else:
+                follow.delete()
+                messages.success(request, f'You unfollowed {author}.')
+
+        next_url = request.POST.get('next')
+        if next_url and url_has_allowed_host_and_scheme(next_url, allowed_hosts={request.get_host()}):
+            return redirect(next_url)
+        return redirect('feed')